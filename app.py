@@ -1,225 +1,2915 @@
 import os
+import re
 import json
+import csv
+import io
 import requests
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
-from collections import defaultdict
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta, timezone
+from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, session, jsonify, stream_with_context, send_from_directory
+from flask import g, before_render_template, template_rendered
+import click
 import markdown
+import threading
+import time
+import random
+import hashlib
+import hmac
+import sqlite3
+import asyncio
+import uuid
+from concurrent.futures import Future
+import sys
+import atexit
+import weakref
+import contextlib
+import socket
+from array import array
+import numpy as np
+from typing import AsyncIterator
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:  # the asyncio client is optional
+    aiohttp = None
+
+# ClickUp API root shared by the threaded and asyncio clients
+CLICKUP_BASE_URL = os.environ.get("CLICKUP_BASE_URL", "https://api.clickup.com/api/v2")
+# HTTP transport settings, overridable through the environment
+HTTP_TIMEOUT = (
+    float(os.environ.get("CLICKUP_CONNECT_TIMEOUT", 5)),
+    float(os.environ.get("CLICKUP_READ_TIMEOUT", 30))
+)
+HTTP_MAX_RETRIES = int(os.environ.get("CLICKUP_MAX_RETRIES", 3))
+HTTP_BACKOFF_FACTOR = float(os.environ.get("CLICKUP_BACKOFF_FACTOR", 0.5))
+# Upper bound on concurrent ClickUp requests issued by a single crawl
+CRAWL_MAX_WORKERS = int(os.environ.get("CLICKUP_MAX_WORKERS", 8))
+
+# Local state shared by every worker process (rate limits, caches, jobs)
+DATA_DIR = os.environ.get("CLICKUP_DATA_DIR", "data")
+# ClickUp request quota per API token; 0 disables client-side rate limiting
+RATE_LIMIT_PER_MINUTE = int(os.environ.get("CLICKUP_RATE_LIMIT", 100))
+RATE_LIMIT_MAX_ATTEMPTS = int(os.environ.get("CLICKUP_RATE_LIMIT_ATTEMPTS", 5))
+
+# Workspace hierarchy cache: entry bound and per-endpoint time-to-live in seconds
+HIERARCHY_CACHE_SIZE = int(os.environ.get("CLICKUP_CACHE_SIZE", 1024))
+HIERARCHY_CACHE_TTLS = {
+    "teams": 600,
+    "spaces": 300,
+    "space": 300,
+    "folders": 120,
+    "lists": 120,
+    "folder_lists": 120
+}
+# Day-bucketed task rollups, which answer any days_back window without a crawl. They hold
+# every task record of a space, so they get their own, much smaller, entry bound
+ROLLUP_CACHE_SIZE = int(os.environ.get("CLICKUP_ROLLUP_CACHE_SIZE", 32))
+ROLLUP_CACHE_TTL = int(os.environ.get("CLICKUP_ROLLUP_TTL", 300))
+
+# Local task mirror; 0 disables it and every crawl downloads tasks from ClickUp
+TASK_STORE_ENABLED = os.environ.get("CLICKUP_TASK_STORE", "1") != "0"
+# Seconds between full re-listings that drop tasks deleted upstream
+TASK_STORE_RECONCILE_INTERVAL = int(os.environ.get("CLICKUP_RECONCILE_INTERVAL", 3600))
+# Serve crawls through the asyncio client (requires aiohttp)
+USE_ASYNC_CLIENT = os.environ.get("CLICKUP_ASYNC", "0") == "1"
+# Background report generation threads per worker process
+REPORT_WORKERS = int(os.environ.get("CLICKUP_REPORT_WORKERS", 2))
+# A running report job that has not moved to a new stage for this many seconds
+# is reported as failed, as its worker was most likely killed
+REPORT_JOB_STALE_AFTER = int(os.environ.get("CLICKUP_REPORT_JOB_STALE_AFTER", 900))
+# Metrics are kept per process and written to SQLite at most this often (seconds)
+METRICS_ENABLED = os.environ.get("CLICKUP_METRICS", "1") != "0"
+METRICS_FLUSH_INTERVAL = float(os.environ.get("CLICKUP_METRICS_FLUSH_INTERVAL", 5))
+# Secret(s) of the registered ClickUp webhooks, comma-separated; webhooks are off without one
+WEBHOOK_SECRET = os.environ.get("CLICKUP_WEBHOOK_SECRET", "")
+# Token used to fetch tasks that an event does not describe fully (taskCreated, taskMoved)
+WEBHOOK_API_TOKEN = os.environ.get("CLICKUP_WEBHOOK_TOKEN", "")
+# Append every verified webhook payload to data/webhooks.jsonl for local replay
+WEBHOOK_RECORD = os.environ.get("CLICKUP_WEBHOOK_RECORD", "0") == "1"
+# Webhook-maintained counters are re-seeded by a crawl after this many seconds,
+# since list and folder changes are not covered by task events
+SPACE_COUNTERS_MAX_AGE = int(os.environ.get("CLICKUP_COUNTERS_MAX_AGE", 6 * 3600))
+# Identical concurrent crawls share one fetch; with SHARED=1 the coalescing also spans
+# gunicorn workers through a lease table in DATA_DIR
+SINGLE_FLIGHT_SHARED = os.environ.get("CLICKUP_SINGLE_FLIGHT_SHARED", "1") == "1"
+# Seconds before another worker takes over a crawl whose leader went silent
+SINGLE_FLIGHT_LEASE = float(os.environ.get("CLICKUP_SINGLE_FLIGHT_LEASE", 120))
+# Dashboard crawls started in the background while the page shell loads
+PREFETCH_MAX_WORKERS = int(os.environ.get("CLICKUP_PREFETCH_MAX_WORKERS", 4))
+# Spaces crawled at once by the team dashboard; each space crawl has its own list workers
+TEAM_MAX_WORKERS = int(os.environ.get("CLICKUP_TEAM_MAX_WORKERS", 4))
+# Pooled connections per API token; by default enough for every team and prefetch crawl
+# at full width, as urllib3 discards the connections of requests beyond the pool
+HTTP_POOL_SIZE = int(os.environ.get("CLICKUP_POOL_SIZE", 0)) or max(
+    20, (TEAM_MAX_WORKERS + PREFETCH_MAX_WORKERS) * CRAWL_MAX_WORKERS
+)
+# OpenAI-compatible chat completions endpoint used for AI reports
+GROQ_API_URL = os.environ.get("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+LLM_TIMEOUT = (HTTP_TIMEOUT[0], float(os.environ.get("GROQ_READ_TIMEOUT", 120)))
+# On-disk cache of LLM completions: total size bound in bytes (0 disables) and TTL in seconds (0 never expires)
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", 0))
+# Size cap of the on-disk cache of rendered report HTML; 0 renders every view
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("RENDER_CACHE_MAX_BYTES", 20 * 1024 * 1024))
+# Estimated input-token budget for a report prompt
+LLM_PROMPT_TOKEN_BUDGET = int(os.environ.get("LLM_PROMPT_TOKEN_BUDGET", 6000))
+# Report mode: "single" prompt, "map_reduce" over assignee chunks, or "auto" (map-reduce when the team overflows the budget)
+LLM_REPORT_MODE = os.environ.get("LLM_REPORT_MODE", "auto")
+LLM_MAP_PARALLELISM = int(os.environ.get("LLM_MAP_PARALLELISM", 4))
+LLM_MAP_CHUNK_TOKENS = int(os.environ.get("LLM_MAP_CHUNK_TOKENS", 2500))
+LLM_MAP_MAX_TOKENS = int(os.environ.get("LLM_MAP_MAX_TOKENS", 400))
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def get_session(api_token: str) -> requests.Session:
+    """Return the pooled keep-alive session for an API token, creating it on first use"""
+    with _sessions_lock:
+        http = _sessions.get(api_token)
+        if http is None:
+            retry = Retry(
+                total=HTTP_MAX_RETRIES,
+                backoff_factor=HTTP_BACKOFF_FACTOR,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=("GET",)
+            )
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_SIZE,
+                pool_maxsize=HTTP_POOL_SIZE,
+                max_retries=retry
+            )
+            http = requests.Session()
+            http.mount("https://", adapter)
+            http.mount("http://", adapter)
+            http.headers.update({
+                "Authorization": api_token,
+                "Content-Type": "application/json"
+            })
+            # The pool is closed once no request holds the session any more, or at exit
+            weakref.finalize(http, adapter.close)
+            _sessions[api_token] = http
+        return http
+
+def release_session(api_token: str) -> None:
+    """
+    Forget the pooled sessions of an API token, as on logout
+
+    Requests still running keep using the session they hold; the session is
+    closed once they are done (see get_session and borrow_async_session).
+    """
+    with _sessions_lock:
+        _sessions.pop(api_token, None)
+    if api_token in _async_sessions:
+        async_runner.run(retire_async_session(api_token))
+
+def token_key(api_token: str) -> str:
+    """Return a stable, non-reversible key for an API token"""
+    return hashlib.sha256(api_token.encode()).hexdigest()[:32]
+
+def connect_sqlite(path: str, autocommit: bool = False) -> sqlite3.Connection:
+    """
+    Open one of the app's SQLite databases in WAL mode, shared by every gunicorn worker
+
+    With ``autocommit`` the caller manages transactions itself (``BEGIN IMMEDIATE``);
+    otherwise the connection works as a transaction context manager.
+    """
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None if autocommit else "")
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+class MetricsRegistry:
+    """
+    Prometheus-style counters and histograms, aggregated across gunicorn workers.
+
+    Each process accumulates samples in memory and writes its cumulative
+    totals to SQLite, one row per process and series, at most every
+    ``flush_interval`` seconds and whenever /metrics is scraped. ``render``
+    sums the rows of every process that has reported, so totals survive
+    worker restarts. All histograms share ``BUCKETS`` so they can be merged.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, db_path: str, flush_interval: float = 5.0):
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pid = None
+        self._descriptions: Dict[str, Tuple[str, str]] = {}
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with connect_sqlite(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS metrics ("
+                "worker TEXT NOT NULL, name TEXT NOT NULL, labels TEXT NOT NULL, kind TEXT NOT NULL, "
+                "value TEXT NOT NULL, PRIMARY KEY (worker, name, labels))"
+            )
+        atexit.register(self.flush)
+
+    def _local(self) -> None:
+        """Reset the in-memory series in a freshly forked worker; call with the lock held"""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._worker = f"{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex[:8]}"
+            self._counters: Dict[Tuple[str, Tuple], float] = defaultdict(float)
+            self._histograms: Dict[Tuple[str, Tuple], List[float]] = {}
+            self._flushed_at = time.time()
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        """Register the type (``counter`` or ``histogram``) and help text of a metric"""
+        self._descriptions[name] = (kind, help_text)
+
+    def inc(self, name: str, labels: Optional[Dict[str, str]] = None, amount: float = 1.0) -> None:
+        """Add ``amount`` to a counter"""
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._local()
+            self._counters[key] += amount
+        self._maybe_flush()
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, str]] = None) -> None:
+        """Record one histogram sample"""
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._local()
+            # Per-bucket (non-cumulative) counts, then the +Inf count, the sum and the total count
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0.0] * (len(self.BUCKETS) + 3)
+            index = next((i for i, bound in enumerate(self.BUCKETS) if value <= bound), len(self.BUCKETS))
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+        self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        if time.time() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write this process's cumulative series to the shared table"""
+        with self._lock:
+            self._local()
+            self._flushed_at = time.time()
+            rows = [(self._worker, name, json.dumps(labels), "counter", json.dumps(value))
+                    for (name, labels), value in self._counters.items()]
+            rows += [(self._worker, name, json.dumps(labels), "histogram", json.dumps(series))
+                     for (name, labels), series in self._histograms.items()]
+        if not rows:
+            return
+        try:
+            with connect_sqlite(self.db_path) as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO metrics (worker, name, labels, kind, value) VALUES (?, ?, ?, ?, ?)", rows
+                )
+        except sqlite3.Error as e:
+            print(f"Error flushing metrics: {e}")
+
+    @staticmethod
+    def _labels(labels: List, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [tuple(pair) for pair in labels] + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+    def render(self) -> str:
+        """Render the series of every worker in the Prometheus text exposition format"""
+        self.flush()
+        with connect_sqlite(self.db_path) as conn:
+            rows = conn.execute("SELECT name, labels, kind, value FROM metrics").fetchall()
+
+        counters: Dict[Tuple[str, str], float] = defaultdict(float)
+        histograms: Dict[Tuple[str, str], List[float]] = {}
+        for name, labels, kind, value in rows:
+            if kind == "counter":
+                counters[(name, labels)] += json.loads(value)
+            else:
+                merged = histograms.setdefault((name, labels), [0.0] * (len(self.BUCKETS) + 3))
+                for index, amount in enumerate(json.loads(value)):
+                    merged[index] += amount
+
+        lines = []
+        described = set()
+
+        def header(name: str, kind: str) -> None:
+            if name not in described:
+                described.add(name)
+                help_text = self._descriptions.get(name, (kind, name))[1]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{self._labels(json.loads(labels))} {value:g}")
+        for (name, labels), series in sorted(histograms.items()):
+            header(name, "histogram")
+            label_pairs = json.loads(labels)
+            cumulative = 0.0
+            for bound, count in zip(self.BUCKETS + ("+Inf",), series):
+                cumulative += count
+                lines.append(f"{name}_bucket{self._labels(label_pairs, ('le', str(bound)))} {cumulative:g}")
+            lines.append(f"{name}_sum{self._labels(label_pairs)} {series[-2]:g}")
+            lines.append(f"{name}_count{self._labels(label_pairs)} {series[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+metrics = (
+    MetricsRegistry(os.path.join(DATA_DIR, "metrics.db"), METRICS_FLUSH_INTERVAL)
+    if METRICS_ENABLED else None
+)
+
+if metrics:
+    metrics.describe("clickup_requests_total", "counter", "ClickUp API requests by endpoint and HTTP status")
+    metrics.describe("clickup_request_duration_seconds", "histogram", "ClickUp API request latency by endpoint")
+    metrics.describe("clickup_response_bytes_total", "counter", "ClickUp API response body bytes by endpoint")
+    metrics.describe("clickup_rate_limit_wait_seconds", "histogram", "Time spent waiting for a rate-limit slot")
+    metrics.describe("llm_requests_total", "counter", "Chat-completion requests by kind and HTTP status")
+    metrics.describe("llm_request_duration_seconds", "histogram", "Chat-completion latency by kind")
+    metrics.describe("llm_first_token_seconds", "histogram", "Time to the first streamed completion delta")
+    metrics.describe("llm_response_bytes_total", "counter", "Chat-completion response bytes by kind")
+    metrics.describe("llm_cache_lookups_total", "counter", "Completion cache lookups by result")
+    metrics.describe("llm_prompt_tokens_total", "counter", "Estimated prompt tokens sent, by prompt: single, map, combine or reduce")
+    metrics.describe("report_stage_seconds", "histogram", "Report generation time by stage")
+    metrics.describe("space_crawl_seconds", "histogram", "Space snapshot crawl time by client")
+    metrics.describe("http_requests_total", "counter", "Flask requests by route, method and status")
+    metrics.describe("http_request_duration_seconds", "histogram", "Flask view time by route and method")
+    metrics.describe("template_render_seconds", "histogram", "Jinja template render time by template")
+    metrics.describe("webhook_events_total", "counter", "ClickUp webhook events by event and result")
+    metrics.describe("single_flight_calls_total", "counter", "Coalesced calls by role: leader, follower or worker_follower")
+
+def endpoint_template(path: str) -> str:
+    """Collapse resource ids in a ClickUp path (``/list/123/task`` -> ``/list/{id}/task``)"""
+    parts = path.split("?")[0].strip("/").split("/")
+    return "/" + "/".join(part if index % 2 == 0 else "{id}" for index, part in enumerate(parts))
+
+def observe_clickup_call(path: str, status: str, elapsed: float, size: int = 0) -> None:
+    """Record one ClickUp API request"""
+    if not metrics:
+        return
+    endpoint = endpoint_template(path)
+    metrics.inc("clickup_requests_total", {"endpoint": endpoint, "status": status})
+    metrics.observe("clickup_request_duration_seconds", elapsed, {"endpoint": endpoint})
+    if size:
+        metrics.inc("clickup_response_bytes_total", {"endpoint": endpoint}, size)
+
+def observe_llm_call(kind: str, status: str, elapsed: float, size: int = 0) -> None:
+    """Record one chat-completions request"""
+    if not metrics:
+        return
+    metrics.inc("llm_requests_total", {"kind": kind, "status": status})
+    metrics.observe("llm_request_duration_seconds", elapsed, {"kind": kind})
+    if size:
+        metrics.inc("llm_response_bytes_total", {"kind": kind}, size)
+
+def record_prompt_tokens(prompt: str, tokens: int) -> None:
+    """Record the estimated input tokens of report prompts"""
+    if metrics:
+        metrics.inc("llm_prompt_tokens_total", {"prompt": prompt}, tokens)
+
+def observe_duration(name: str, started: float, labels: Optional[Dict[str, str]] = None) -> None:
+    """Record the time since ``started`` (a perf_counter value) in a histogram"""
+    if metrics:
+        metrics.observe(name, time.perf_counter() - started, labels)
+
+class RateLimitScheduler:
+    """
+    Token-bucket scheduler for ClickUp requests, keyed by API token.
+
+    Bucket state lives in a SQLite database so every gunicorn worker draws
+    from the same quota. Callers block in ``acquire`` until a request slot is
+    free instead of failing, and the bucket is corrected from the
+    ``X-RateLimit-*`` headers ClickUp returns on every response.
+    """
+
+    def __init__(self, db_path: str, per_minute: int = 100, max_wait: float = 60.0):
+        self.db_path = db_path
+        self.capacity = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.max_wait = max_wait
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with connect_sqlite(self.db_path, autocommit=True) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, capacity REAL NOT NULL, "
+                "updated_at REAL NOT NULL, reset_at REAL NOT NULL DEFAULT 0)"
+            )
+
+    def _load(self, conn: sqlite3.Connection, key: str, now: float) -> Tuple[float, float, float]:
+        """Read a bucket and refill it up to ``now``"""
+        row = conn.execute(
+            "SELECT tokens, capacity, updated_at, reset_at FROM rate_limits WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return self.capacity, self.capacity, 0.0
+        tokens, capacity, updated_at, reset_at = row
+        if reset_at and now >= reset_at:
+            # The server-side window has rolled over
+            tokens, reset_at = capacity, 0.0
+        else:
+            tokens = min(capacity, tokens + (now - updated_at) * capacity / 60.0)
+        return tokens, capacity, reset_at
+
+    def _store(self, conn: sqlite3.Connection, key: str, tokens: float, capacity: float, now: float, reset_at: float) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO rate_limits (key, tokens, capacity, updated_at, reset_at) VALUES (?, ?, ?, ?, ?)",
+            (key, tokens, capacity, now, reset_at)
+        )
+
+    def acquire(self, api_token: str) -> None:
+        """Block until a request slot is available for the token"""
+        key = token_key(api_token)
+        deadline = time.time() + self.max_wait
+        while True:
+            conn = connect_sqlite(self.db_path, autocommit=True)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                now = time.time()
+                tokens, capacity, reset_at = self._load(conn, key, now)
+                if tokens >= 1:
+                    self._store(conn, key, tokens - 1, capacity, now, reset_at)
+                    conn.execute("COMMIT")
+                    return
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+
+            wait = (1 - tokens) * 60.0 / capacity
+            if reset_at:
+                wait = min(wait, max(0.0, reset_at - now))
+            if now >= deadline:
+                return
+            # Jitter spreads out workers that would otherwise wake up together
+            time.sleep(min(wait, deadline - now) + random.uniform(0, 0.1))
+
+    def observe(self, api_token: str, status_code: int, headers: Dict) -> None:
+        """Correct the bucket from the status and rate-limit headers of a response"""
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None and status_code != 429:
+            return
+
+        key = token_key(api_token)
+        conn = connect_sqlite(self.db_path, autocommit=True)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            tokens, capacity, reset_at = self._load(conn, key, now)
+            if headers.get("X-RateLimit-Limit"):
+                capacity = float(headers["X-RateLimit-Limit"])
+            if remaining is not None:
+                tokens = min(tokens, float(remaining))
+            if status_code == 429:
+                tokens = 0.0
+            if headers.get("X-RateLimit-Reset"):
+                reset_at = float(headers["X-RateLimit-Reset"])
+            self._store(conn, key, tokens, capacity, now, reset_at)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def backoff(attempt: int, headers: Dict) -> float:
+        """Seconds to wait before retrying a 429, with full jitter"""
+        retry_after = headers.get("Retry-After")
+        reset = headers.get("X-RateLimit-Reset")
+        if retry_after:
+            base = float(retry_after)
+        elif reset:
+            base = max(0.0, float(reset) - time.time())
+        else:
+            base = min(30.0, 2 ** attempt)
+        return base + random.uniform(0, min(5.0, 2 ** attempt))
+
+rate_limiter = (
+    RateLimitScheduler(os.path.join(DATA_DIR, "rate_limits.db"), RATE_LIMIT_PER_MINUTE)
+    if RATE_LIMIT_PER_MINUTE > 0 else None
+)
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-endpoint TTLs and LRU eviction.
+
+    Keys are ``(token_key, endpoint, resource_id)`` tuples so entries can be
+    invalidated per token, per endpoint or per resource.
+    """
+
+    def __init__(self, max_entries: int, ttls: Dict[str, float]):
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, api_token: str, endpoint: str, resource_id: str) -> Tuple[bool, Any]:
+        """Return ``(True, value)`` for a fresh entry, ``(False, None)`` otherwise"""
+        key = (token_key(api_token), endpoint, str(resource_id))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def store(self, api_token: str, endpoint: str, resource_id: str, value: Any) -> None:
+        """Cache a value under the endpoint's TTL, evicting the least recently used entries"""
+        key = (token_key(api_token), endpoint, str(resource_id))
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttls.get(endpoint, 60), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, api_token: str, endpoint: str, resource_id: str, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for a resource, calling ``loader`` on a miss"""
+        hit, value = self.lookup(api_token, endpoint, resource_id)
+        if not hit:
+            value = loader()
+            self.store(api_token, endpoint, resource_id, value)
+        return value
+
+    def invalidate(self, api_token: Optional[str] = None, endpoint: Optional[str] = None,
+                   resource_id: Optional[str] = None) -> int:
+        """Drop every entry matching the given filters; returns how many were dropped"""
+        token = token_key(api_token) if api_token else None
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if (token is None or key[0] == token)
+                and (endpoint is None or key[1] == endpoint)
+                and (resource_id is None or key[2] == str(resource_id))
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries
+            }
+
+hierarchy_cache = TTLCache(HIERARCHY_CACHE_SIZE, HIERARCHY_CACHE_TTLS)
+rollup_cache = TTLCache(ROLLUP_CACHE_SIZE, {"rollup": ROLLUP_CACHE_TTL})
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one.
+
+    Within a process, callers of ``do`` with the same key while a call is in
+    flight wait on it and share its result or exception. With a database,
+    a lease row per key also elects one leader across gunicorn workers:
+    workers that find a live lease register as waiters and poll, and the
+    leader publishes its result as JSON only when someone is waiting. The
+    leader renews its lease while the call runs; a lease that expires
+    without a result is taken over. Results are shared, not copied, so
+    callers must treat them as read-only.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, lease: float = 120.0, poll_interval: float = 0.1):
+        self.db_path = db_path
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            with connect_sqlite(self.db_path, autocommit=True) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS flights ("
+                    "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL, "
+                    "waiters INTEGER NOT NULL DEFAULT 0, finished_at REAL, result BLOB)"
+                )
+
+    def do(self, key: str, fn: Callable[[], Any], encode: Callable[[Any], Any] = None,
+           decode: Callable[[Any], Any] = None) -> Any:
+        """
+        Return ``fn()``, or the result of the identical call already in flight
+
+        ``encode`` and ``decode`` convert a result to and from JSON-safe
+        values for other workers; by default it must be JSON-safe itself.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            if metrics:
+                metrics.inc("single_flight_calls_total", {"role": "follower"})
+            return future.result()
+
+        try:
+            result = self._lead_across_workers(key, fn, encode, decode) if self.db_path else fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def _lead_across_workers(self, key: str, fn: Callable[[], Any], encode: Optional[Callable[[Any], Any]],
+                             decode: Optional[Callable[[Any], Any]]) -> Any:
+        """Run ``fn`` under the key's lease, or wait for the worker holding it"""
+        owner = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        waiting = False
+        while True:
+            conn = connect_sqlite(self.db_path, autocommit=True)
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT expires_at, finished_at, result FROM flights WHERE key = ?", (key,)
+                ).fetchone()
+                now = time.time()
+                if waiting and row and row[1] is not None and row[2] is not None:
+                    conn.execute("COMMIT")
+                    if metrics:
+                        metrics.inc("single_flight_calls_total", {"role": "worker_follower"})
+                    # JSON rather than pickle: a row in a shared database must not be able to run code
+                    result = json.loads(row[2])
+                    return decode(result) if decode else result
+                if row is None or row[1] is not None or row[0] < now:
+                    # Nothing in flight, or its leader is gone: lead this call
+                    conn.execute(
+                        "INSERT OR REPLACE INTO flights (key, owner, expires_at, waiters, finished_at, result) "
+                        "VALUES (?, ?, ?, 0, NULL, NULL)",
+                        (key, owner, now + self.lease)
+                    )
+                    conn.execute("COMMIT")
+                    break
+                if not waiting:
+                    conn.execute("UPDATE flights SET waiters = waiters + 1 WHERE key = ?", (key,))
+                    waiting = True
+                conn.execute("COMMIT")
+            finally:
+                conn.close()
+            time.sleep(self.poll_interval)
+
+        if metrics:
+            metrics.inc("single_flight_calls_total", {"role": "leader"})
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._renew_lease, args=(key, owner, done), daemon=True)
+        heartbeat.start()
+        try:
+            result = fn()
+        except BaseException:
+            with connect_sqlite(self.db_path, autocommit=True) as conn:
+                conn.execute("DELETE FROM flights WHERE key = ? AND owner = ?", (key, owner))
+            raise
+        finally:
+            done.set()
+            heartbeat.join()
+
+        conn = connect_sqlite(self.db_path, autocommit=True)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT waiters FROM flights WHERE key = ? AND owner = ?", (key, owner)).fetchone()
+            payload = json.dumps(encode(result) if encode else result) if row and row[0] else None
+            now = time.time()
+            conn.execute(
+                "UPDATE flights SET finished_at = ?, result = ? WHERE key = ? AND owner = ?",
+                (now, payload, key, owner)
+            )
+            # Waiters poll every poll_interval, so older results are no longer wanted
+            conn.execute("DELETE FROM flights WHERE finished_at < ?", (now - max(60.0, self.poll_interval * 10),))
+            conn.execute("COMMIT")
+        except Exception as e:
+            conn.execute("ROLLBACK")
+            print(f"Error publishing single-flight result: {e}")
+        finally:
+            conn.close()
+        return result
+
+    def _renew_lease(self, key: str, owner: str, done: threading.Event) -> None:
+        """Keep the key's lease alive until ``done`` is set, so a slow call is not taken over"""
+        while not done.wait(self.lease / 3):
+            try:
+                with connect_sqlite(self.db_path, autocommit=True) as conn:
+                    conn.execute(
+                        "UPDATE flights SET expires_at = ? WHERE key = ? AND owner = ? AND finished_at IS NULL",
+                        (time.time() + self.lease, key, owner)
+                    )
+            except sqlite3.Error as e:
+                print(f"Error renewing single-flight lease: {e}")
+
+crawl_flights = SingleFlight(
+    os.path.join(DATA_DIR, "single_flight.db") if SINGLE_FLIGHT_SHARED else None,
+    SINGLE_FLIGHT_LEASE
+)
+
+def flight_key(api_token: str, kind: str, *params: Any) -> str:
+    """Single-flight key of a crawl: the token scope, what is crawled and its filters"""
+    return ":".join([token_key(api_token), kind] + [str(param) for param in params])
+
+class TaskStore:
+    """
+    SQLite mirror of ClickUp tasks, kept per list and per API token.
+
+    Tokens see different tasks of the same list (guests, private tasks), so
+    every row belongs to the ``token_key`` it was fetched with and is only
+    served back to that token.
+
+    Each list remembers the highest ``date_updated`` it has seen, so a sync
+    only asks ClickUp for tasks updated since then (``date_updated_gt``).
+    Deletions never show up in such a delta, so every
+    ``reconcile_interval`` seconds a list is re-listed in full and rows that
+    were not seen again are dropped. Syncs of one list may overlap: writes
+    never lower a row's generation, and rows updated after a full listing
+    started are kept, as it may have paged past them.
+    """
+
+    def __init__(self, db_path: str, reconcile_interval: int = 3600):
+        self.db_path = db_path
+        self.reconcile_interval = reconcile_interval
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with connect_sqlite(self.db_path) as conn:
+            # A mirror from before rows were scoped by token cannot be attributed; it is only a cache
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(tasks)")]
+            if columns and "owner" not in columns:
+                conn.execute("DROP TABLE tasks")
+                conn.execute("DROP TABLE IF EXISTS list_sync")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "owner TEXT NOT NULL, task_id TEXT NOT NULL, list_id TEXT NOT NULL, date_created INTEGER NOT NULL, "
+                "date_updated INTEGER NOT NULL, sync_gen INTEGER NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (owner, task_id))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_by_list ON tasks (owner, list_id, date_created)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS list_sync ("
+                "owner TEXT NOT NULL, list_id TEXT NOT NULL, high_water INTEGER NOT NULL, sync_gen INTEGER NOT NULL, "
+                "synced_at REAL NOT NULL, reconciled_at REAL NOT NULL, PRIMARY KEY (owner, list_id))"
+            )
+
+    def begin_sync(self, api_token: str, list_id: str) -> Dict:
+        """Plan a sync of a list for a token; returns the state to pass to store_tasks and finish_sync"""
+        owner = token_key(api_token)
+        with connect_sqlite(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT high_water, sync_gen, reconciled_at FROM list_sync WHERE owner = ? AND list_id = ?",
+                (owner, list_id)
+            ).fetchone()
+
+        now = time.time()
+        full = row is None or now - row[2] >= self.reconcile_interval
+        high_water, sync_gen, reconciled_at = row if row else (0, 0, 0.0)
+        # Closed tasks are mirrored too: ClickUp leaves them out by default, so a task
+        # closed since the last sync would otherwise never reach a delta
+        params = {"include_closed": "true"}
+        if full:
+            sync_gen += 1
+            reconciled_at = now
+        else:
+            # Overlap by a millisecond; upserts make re-seen tasks harmless
+            params["date_updated_gt"] = max(0, high_water - 1)
+
+        return {
+            "owner": owner,
+            "list_id": list_id,
+            "params": params,
+            "full": full,
+            "high_water": high_water,
+            "sync_gen": sync_gen,
+            "started_at": now,
+            "reconciled_at": reconciled_at
+        }
+
+    def store_tasks(self, state: Dict, tasks: List[Dict]) -> None:
+        """Upsert a batch of tasks fetched for a sync"""
+        rows = []
+        for task in tasks:
+            date_updated = int(task.get("date_updated") or 0)
+            state["high_water"] = max(state["high_water"], date_updated)
+            rows.append((
+                state["owner"], task["id"], state["list_id"], int(task.get("date_created") or 0),
+                date_updated, state["sync_gen"], json.dumps(task)
+            ))
+        with connect_sqlite(self.db_path) as conn:
+            # A delta that overlaps a full listing must not pull re-listed rows back a generation
+            conn.executemany(
+                "INSERT INTO tasks (owner, task_id, list_id, date_created, date_updated, sync_gen, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (owner, task_id) DO UPDATE SET "
+                "list_id = excluded.list_id, date_created = excluded.date_created, "
+                "date_updated = excluded.date_updated, sync_gen = MAX(tasks.sync_gen, excluded.sync_gen), "
+                "data = excluded.data",
+                rows
+            )
+
+    def finish_sync(self, state: Dict) -> None:
+        """Record the new high-water mark and, after a full listing, drop deleted tasks"""
+        with connect_sqlite(self.db_path) as conn:
+            if state["full"]:
+                # Anything not re-listed was deleted (or moved) upstream, unless a concurrent
+                # sync stored it after this listing began
+                conn.execute(
+                    "DELETE FROM tasks WHERE owner = ? AND list_id = ? AND sync_gen < ? AND date_updated < ?",
+                    (state["owner"], state["list_id"], state["sync_gen"], int(state["started_at"] * 1000))
+                )
+            # An overlapping sync that finishes last must not roll the list's state back
+            conn.execute(
+                "INSERT INTO list_sync (owner, list_id, high_water, sync_gen, synced_at, reconciled_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (owner, list_id) DO UPDATE SET "
+                "high_water = MAX(list_sync.high_water, excluded.high_water), "
+                "sync_gen = MAX(list_sync.sync_gen, excluded.sync_gen), "
+                "synced_at = MAX(list_sync.synced_at, excluded.synced_at), "
+                "reconciled_at = MAX(list_sync.reconciled_at, excluded.reconciled_at)",
+                (state["owner"], state["list_id"], state["high_water"], state["sync_gen"],
+                 state["started_at"], state["reconciled_at"])
+            )
+
+    def sync_list(self, api_token: str, list_id: str, fetch: Callable[[Dict], Iterator[Dict]],
+                  batch_size: int = 100) -> None:
+        """
+        Bring a token's mirror of a list up to date
+
+        Args:
+            api_token (str): Token the tasks are fetched with
+            list_id (str): ID of the list to sync
+            fetch (callable): Streams the list's tasks from ClickUp for the given query params
+            batch_size (int): Number of tasks written per transaction
+        """
+        state = self.begin_sync(api_token, list_id)
+        batch = []
+        for task in fetch(state["params"]):
+            batch.append(task)
+            if len(batch) >= batch_size:
+                self.store_tasks(state, batch)
+                batch = []
+        if batch:
+            self.store_tasks(state, batch)
+        self.finish_sync(state)
+
+    def iter_tasks(self, api_token: str, list_id: str, created_after: Optional[int] = None,
+                   include_closed: bool = False) -> Iterator[Dict]:
+        """
+        Stream a token's mirrored tasks of a list, optionally only those created after a timestamp (ms)
+
+        Closed tasks are skipped unless ``include_closed`` is set, matching
+        what ClickUp's list endpoint returns by default.
+        """
+        conn = connect_sqlite(self.db_path)
+        try:
+            cursor = conn.execute(
+                "SELECT data FROM tasks WHERE owner = ? AND list_id = ? AND date_created > ? ORDER BY rowid",
+                (token_key(api_token), list_id, created_after or -1)
+            )
+            for (data,) in cursor:
+                task = json.loads(data)
+                if include_closed or (task.get("status") or {}).get("type") != "closed":
+                    yield task
+        finally:
+            conn.close()
+
+    def delete_task(self, task_id: str) -> None:
+        """Drop a task deleted upstream from every token's mirror without waiting for the next full listing"""
+        with connect_sqlite(self.db_path) as conn:
+            conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+
+    def forget_list(self, list_id: str) -> None:
+        """Drop every token's mirror of a list so the next sync downloads it in full"""
+        with connect_sqlite(self.db_path) as conn:
+            conn.execute("DELETE FROM tasks WHERE list_id = ?", (list_id,))
+            conn.execute("DELETE FROM list_sync WHERE list_id = ?", (list_id,))
+
+task_store = (
+    TaskStore(os.path.join(DATA_DIR, "tasks.db"), TASK_STORE_RECONCILE_INTERVAL)
+    if TASK_STORE_ENABLED else None
+)
 
 # Import your existing classes and modify them slightly for web integration
 class ClickUpManager:
-    def __init__(self, api_token: str):
+    def __init__(self, api_token: str, max_workers: Optional[int] = None):
         self.api_token = api_token
-        self.headers = {
-            "Authorization": api_token,
-            "Content-Type": "application/json"
-        }
-        self.base_url = "https://api.clickup.com/api/v2"
+        self.max_workers = max(1, max_workers or CRAWL_MAX_WORKERS)
+        # Auth headers live on the pooled session (see get_session)
+        self.base_url = CLICKUP_BASE_URL
+        self.session = get_session(api_token)
+
+    def _get(self, path: str, params: Optional[Dict] = None) -> Dict:
+        """
+        Issue a GET against the ClickUp API over the shared session
+
+        Requests are paced by the shared rate limiter, and a 429 is retried
+        with jittered backoff instead of being surfaced to the caller.
+        """
+        for attempt in range(RATE_LIMIT_MAX_ATTEMPTS):
+            if rate_limiter:
+                waited = time.perf_counter()
+                rate_limiter.acquire(self.api_token)
+                observe_duration("clickup_rate_limit_wait_seconds", waited)
+            started = time.perf_counter()
+            try:
+                response = self.session.get(
+                    f"{self.base_url}{path}",
+                    params=params,
+                    timeout=HTTP_TIMEOUT
+                )
+            except requests.RequestException:
+                observe_clickup_call(path, "error", time.perf_counter() - started)
+                raise
+            observe_clickup_call(path, str(response.status_code), time.perf_counter() - started, len(response.content))
+            if rate_limiter:
+                rate_limiter.observe(self.api_token, response.status_code, response.headers)
+            if response.status_code != 429:
+                break
+            if attempt < RATE_LIMIT_MAX_ATTEMPTS - 1:
+                time.sleep(RateLimitScheduler.backoff(attempt, response.headers))
+        response.raise_for_status()
+        return response.json()
+
+    def _cached(self, endpoint: str, resource_id: str, loader: Callable[[], Any]) -> Any:
+        """Serve a hierarchy endpoint through the shared TTL cache"""
+        return hierarchy_cache.get_or_load(self.api_token, endpoint, resource_id, loader)
 
     def get_all_teams(self) -> List[Dict]:
         """Get all teams (workspaces) the user has access to"""
-        response = requests.get(
-            f"{self.base_url}/team",
-            headers=self.headers
-        )
-        response.raise_for_status()
-        return response.json()["teams"]
+        return self._cached("teams", "", lambda: self._get("/team")["teams"])
 
     def get_spaces_in_team(self, team_id: str) -> List[Dict]:
         """Get all spaces within a specific team"""
-        response = requests.get(
-            f"{self.base_url}/team/{team_id}/space",
-            headers=self.headers
-        )
-        response.raise_for_status()
-        return response.json()["spaces"]
+        return self._cached("spaces", team_id, lambda: self._get(f"/team/{team_id}/space")["spaces"])
 
     def get_lists_in_space(self, space_id: str) -> List[Dict]:
         """Get all lists within a space"""
-        url = f"{self.base_url}/space/{space_id}/list"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()["lists"]
+        return self._cached("lists", space_id, lambda: self._get(f"/space/{space_id}/list")["lists"])
 
     def get_folder_lists(self, folder_id: str) -> List[Dict]:
         """Get all lists within a folder"""
-        url = f"{self.base_url}/folder/{folder_id}/list"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()["lists"]
+        return self._cached("folder_lists", folder_id, lambda: self._get(f"/folder/{folder_id}/list")["lists"])
 
     def get_folders_in_space(self, space_id: str) -> List[Dict]:
         """Get all folders within a space"""
-        url = f"{self.base_url}/space/{space_id}/folder"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()["folders"]
+        return self._cached("folders", space_id, lambda: self._get(f"/space/{space_id}/folder")["folders"])
+
+    def get_task_page(self, list_id: str, params: Optional[Dict] = None, page: int = 0) -> Dict:
+        """Get a single page of tasks within a list, including its last_page flag"""
+        page_params = dict(params or {})
+        page_params["page"] = page
+        return self._get(f"/list/{list_id}/task", page_params)
+
+    def iter_tasks(self, list_id: str, params: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Stream every task within a list, page by page
+
+        Page N+1 is requested in the background while the tasks of page N are
+        being consumed, so only two pages are ever held in memory.
+        """
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            page = 0
+            pending = prefetcher.submit(self.get_task_page, list_id, params, page)
+            while pending is not None:
+                data = pending.result()
+                tasks = data.get("tasks", [])
+                pending = None
+                if tasks and not data.get("last_page", True):
+                    page += 1
+                    pending = prefetcher.submit(self.get_task_page, list_id, params, page)
+                yield from tasks
 
     def get_tasks_in_list(self, list_id: str, params: Optional[Dict] = None) -> List[Dict]:
-        """Get all tasks within a list"""
-        url = f"{self.base_url}/list/{list_id}/task"
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
-        return response.json()["tasks"]
+        """Get all tasks within a list, across every page"""
+        return list(self.iter_tasks(list_id, params))
+
+    def iter_list_tasks(self, list_id: str, created_after: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Stream the tasks of a list for aggregation
+
+        When the local task store is enabled the list is synced incrementally
+        and read back from the store; otherwise it is streamed from ClickUp.
+        """
+        if task_store is None:
+            params = {"date_created_gt": created_after} if created_after else None
+            return self.iter_tasks(list_id, params)
+
+        task_store.sync_list(self.api_token, list_id, lambda params: self.iter_tasks(list_id, params))
+        return task_store.iter_tasks(self.api_token, list_id, created_after)
 
     def get_space_details(self, space_id: str) -> Dict:
         """Get space information"""
-        response = requests.get(
-            f"{self.base_url}/space/{space_id}",
-            headers=self.headers
+        return self._cached("space", space_id, lambda: self._get(f"/space/{space_id}"))
+
+    def get_task(self, task_id: str) -> Dict:
+        """Get a single task, including its list and space"""
+        return self._get(f"/task/{task_id}")
+
+    def get_space_hierarchy(self, space_id: str, executor: ThreadPoolExecutor) -> Tuple[List[Dict], List[Dict]]:
+        """Get the folders of a space and every list in it, folderless lists first"""
+        folders_future = executor.submit(self.get_folders_in_space, space_id)
+        space_lists_future = executor.submit(self.get_lists_in_space, space_id)
+        folders = folders_future.result()
+        all_lists = space_lists_future.result().copy()
+
+        # Fetch folder lists in parallel; map() keeps folder order
+        for folder_lists in executor.map(lambda folder: self.get_folder_lists(folder["id"]), folders):
+            all_lists.extend(folder_lists)
+
+        return folders, all_lists
+
+COMPLETED_STATUSES = ("complete", "completed", "done")
+
+def new_task_stats() -> Dict:
+    """Return an empty task statistics structure"""
+    return {
+        "total_tasks": 0,
+        "completed_tasks": 0,
+        "open_tasks": 0,
+        "tasks_by_status": {},
+        "tasks_by_priority": {
+            "urgent": 0,
+            "high": 0,
+            "normal": 0,
+            "low": 0,
+            "no_priority": 0
+        },
+        "lists_count": 0,
+        "folders_count": 0
+    }
+
+DAY_MS = 24 * 60 * 60 * 1000
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+def priority_key(priority: Optional[Dict]) -> str:
+    """Bucket name of a ClickUp priority object, as used in tasks_by_priority"""
+    return priority["priority"].lower() if priority and priority.get("priority") else "no_priority"
+
+class TaskColumns:
+    """
+    Columnar, dictionary-encoded task table for vectorized aggregation.
+
+    Tasks are appended once into typed integer columns (status, priority,
+    list, creation day) plus an exploded task/assignee column pair, with
+    each distinct value stored once in a per-dimension dictionary.
+    ``group_counts`` then counts any combination of dimensions with a
+    single NumPy pass: the codes are combined into one mixed-radix key and
+    counted with ``np.unique``. Appends are thread-safe so crawl workers
+    can share one table.
+    """
+
+    TASK_DIMENSIONS = ("status", "priority", "list", "created_day")
+    DIMENSIONS = TASK_DIMENSIONS + ("assignee",)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, List] = {dimension: [] for dimension in self.DIMENSIONS}
+        self._codes: Dict[str, Dict] = {dimension: {} for dimension in self.DIMENSIONS}
+        self._columns = {dimension: array("q") for dimension in self.TASK_DIMENSIONS}
+        self._created = array("q")
+        self._assigned_task = array("q")
+        self._assigned_to = array("q")
+
+    def __len__(self) -> int:
+        return len(self._created)
+
+    def _encode(self, dimension: str, value: Any) -> int:
+        codes = self._codes[dimension]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._values[dimension])
+            self._values[dimension].append(value)
+        return code
+
+    def append(self, status: str, priority: str, list_name: str, date_created: int = 0,
+               assignee_ids: Sequence = ()) -> None:
+        """Append one task; ``date_created`` is in milliseconds"""
+        with self._lock:
+            index = len(self._created)
+            self._columns["status"].append(self._encode("status", status))
+            self._columns["priority"].append(self._encode("priority", priority))
+            self._columns["list"].append(self._encode("list", list_name))
+            self._columns["created_day"].append(self._encode("created_day", date_created // DAY_MS))
+            self._created.append(date_created)
+            for assignee_id in assignee_ids:
+                self._assigned_task.append(index)
+                self._assigned_to.append(self._encode("assignee", assignee_id))
+
+    def append_task(self, task: Dict, list_name: str) -> None:
+        """Append a raw ClickUp task"""
+        self.append(
+            task["status"]["status"],
+            priority_key(task.get("priority")),
+            list_name,
+            int(task.get("date_created") or 0),
+            [assignee["id"] for assignee in task.get("assignees", [])]
         )
-        response.raise_for_status()
-        return response.json()
 
-class ClickUpTaskCounter(ClickUpManager):
-    def count_tasks_in_space(self, space_id: str, days_back: Optional[int] = None) -> Dict:
+    def group_counts(self, dimensions: Sequence[str], created_after: Optional[int] = None,
+                     created_before: Optional[int] = None) -> Dict[Tuple, int]:
+        """
+        Count tasks grouped by any combination of dimensions
+
+        Grouping by ``assignee`` counts task/assignee pairs, so a task with
+        two assignees counts once for each. ``created_after`` and
+        ``created_before`` (milliseconds, exclusive) restrict the tasks counted.
+        """
+        with self._lock:
+            created = np.array(self._created, dtype=np.int64)
+            columns = {dimension: np.array(self._columns[dimension], dtype=np.int64) for dimension in dimensions
+                       if dimension in self._columns}
+            assigned_task = np.array(self._assigned_task, dtype=np.int64)
+            assigned_to = np.array(self._assigned_to, dtype=np.int64)
+            values = {dimension: list(self._values[dimension]) for dimension in dimensions}
+
+        mask = np.ones(len(created), dtype=bool)
+        if created_after is not None:
+            mask &= created > created_after
+        if created_before is not None:
+            mask &= created < created_before
+
+        if "assignee" in dimensions:
+            keep = mask[assigned_task]
+            rows = assigned_task[keep]
+            codes = [assigned_to[keep] if dimension == "assignee" else columns[dimension][rows]
+                     for dimension in dimensions]
+        else:
+            rows = np.nonzero(mask)[0]
+            codes = [columns[dimension][rows] for dimension in dimensions]
+
+        if not len(rows):
+            return {}
+
+        sizes = [len(values[dimension]) for dimension in dimensions]
+        keys = np.ravel_multi_index(codes, sizes)
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        groups = zip(*(code.tolist() for code in np.unravel_index(unique_keys, sizes)))
+        return {
+            tuple(values[dimension][code] for dimension, code in zip(dimensions, group)): count
+            for group, count in zip(groups, counts.tolist())
+        }
+
+    def task_stats(self, created_after: Optional[int] = None) -> Dict:
+        """Task statistics in the shape of new_task_stats, from one grouped count"""
+        by_status: Dict[str, int] = defaultdict(int)
+        by_priority: Dict[str, int] = defaultdict(int)
+        for (status, priority), count in self.group_counts(("status", "priority"), created_after).items():
+            by_status[status] += count
+            by_priority[priority] += count
+        return build_task_stats(by_status, by_priority)
+
+def build_task_stats(by_status: Dict[str, int], by_priority: Dict[str, int]) -> Dict:
+    """Task statistics in the shape of new_task_stats from per-status and per-priority counts"""
+    task_stats = new_task_stats()
+    for status, count in sorted(by_status.items(), key=lambda item: (-item[1], item[0])):
+        task_stats["tasks_by_status"][status] = count
+        task_stats["total_tasks"] += count
+        if status.lower() in COMPLETED_STATUSES:
+            task_stats["completed_tasks"] += count
+        else:
+            task_stats["open_tasks"] += count
+
+    # Unexpected priority names are counted after the standard ones
+    for priority, count in sorted(by_priority.items()):
+        task_stats["tasks_by_priority"][priority] = task_stats["tasks_by_priority"].get(priority, 0) + count
+
+    return task_stats
+
+class DailyRollup:
+    """
+    Task counts bucketed by UTC creation day.
+
+    For each dimension (status, priority, assignee) the counts are kept as a
+    days x values matrix of running totals, so the counts of any range of
+    days are the difference of two rows. Assignee counts are per
+    task/assignee pair, as in TaskColumns.
+    """
+
+    DIMENSIONS = ("status", "priority", "assignee")
+
+    def __init__(self, day_counts: Dict[str, Dict[Tuple[int, Any], int]]):
+        days = sorted({day for counts in day_counts.values() for day, _ in counts})
+        self.first_day = days[0] if days else 0
+        self.last_day = days[-1] if days else -1
+        span = self.last_day - self.first_day + 1
+        self._values: Dict[str, List] = {}
+        self._totals: Dict[str, np.ndarray] = {}
+        for dimension in self.DIMENSIONS:
+            counts = day_counts.get(dimension, {})
+            values = sorted({value for _, value in counts}, key=str)
+            index = {value: position for position, value in enumerate(values)}
+            # Row i + 1 holds the counts of day first_day + i; row 0 stays empty
+            matrix = np.zeros((span + 1, len(values)), dtype=np.int64)
+            for (day, value), count in counts.items():
+                matrix[day - self.first_day + 1, index[value]] += count
+            self._values[dimension] = values
+            self._totals[dimension] = np.cumsum(matrix, axis=0)
+
+    @classmethod
+    def from_columns(cls, columns: TaskColumns) -> "DailyRollup":
+        """Bucket a crawled task table with one grouped count per dimension"""
+        return cls({dimension: columns.group_counts(("created_day", dimension)) for dimension in cls.DIMENSIONS})
+
+    def _rows(self, first_day: Optional[int], last_day: Optional[int]) -> Tuple[int, int]:
+        span = self.last_day - self.first_day + 1
+        start = 0 if first_day is None else min(max(first_day - self.first_day, 0), span)
+        end = span if last_day is None else min(max(last_day - self.first_day + 1, 0), span)
+        return start, max(start, end)
+
+    def counts(self, dimension: str, first_day: Optional[int] = None, last_day: Optional[int] = None) -> Dict[Any, int]:
+        """Counts per value of tasks created between two days, inclusive; None leaves a side open"""
+        start, end = self._rows(first_day, last_day)
+        totals = self._totals[dimension]
+        window = (totals[end] - totals[start]).tolist()
+        return {value: count for value, count in zip(self._values[dimension], window) if count}
+
+    def task_stats(self, first_day: Optional[int] = None, last_day: Optional[int] = None) -> Dict:
+        """Task statistics in the shape of new_task_stats for tasks created between two days"""
+        return build_task_stats(self.counts("status", first_day, last_day), self.counts("priority", first_day, last_day))
+
+    def to_json(self) -> Dict:
+        """JSON-safe form of the rollup; values stay in lists, so numeric ids keep their type"""
+        return {
+            "first_day": self.first_day,
+            "last_day": self.last_day,
+            "values": self._values,
+            "totals": {dimension: totals.tolist() for dimension, totals in self._totals.items()}
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "DailyRollup":
+        """Rebuild a rollup from ``to_json`` output"""
+        rollup = cls.__new__(cls)
+        rollup.first_day = data["first_day"]
+        rollup.last_day = data["last_day"]
+        rollup._values = data["values"]
+        rollup._totals = {dimension: np.array(totals, dtype=np.int64) for dimension, totals in data["totals"].items()}
+        return rollup
+
+    def trend(self, dimension: str, first_day: Optional[int] = None, last_day: Optional[int] = None) -> Dict:
+        """Tasks created per day, one series per value of ``dimension``"""
+        first_day = self.first_day if first_day is None else first_day
+        last_day = self.last_day if last_day is None else last_day
+        values = self._values[dimension]
+        daily = np.zeros((max(last_day - first_day + 1, 0), len(values)), dtype=np.int64)
+
+        # Copy the overlap of the requested days and the bucketed ones
+        start, end = self._rows(first_day, last_day)
+        if end > start:
+            offset = self.first_day + start - first_day
+            daily[offset:offset + end - start] = np.diff(self._totals[dimension][start:end + 1], axis=0)
+
+        return {
+            "days": [day_to_iso(day) for day in range(first_day, last_day + 1)],
+            "series": {str(value): daily[:, index].tolist() for index, value in enumerate(values)}
+        }
+
+def day_to_iso(day: int) -> str:
+    """ISO date of a day number counted from the Unix epoch"""
+    return datetime.fromordinal(day + EPOCH_ORDINAL).date().isoformat()
+
+def created_days(days_back: Optional[int] = None, start: Optional[str] = None,
+                 end: Optional[str] = None) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Inclusive range of UTC creation days for a ``days_back`` window or ISO ``start``/``end`` dates
+
+    Explicit dates win over ``days_back``; None leaves a side open.
+    Raises ValueError for a malformed date.
+    """
+    if start or end:
+        return (
+            datetime.fromisoformat(start).date().toordinal() - EPOCH_ORDINAL if start else None,
+            datetime.fromisoformat(end).date().toordinal() - EPOCH_ORDINAL if end else None
+        )
+    if days_back:
+        return (int(time.time() * 1000) - days_back * DAY_MS) // DAY_MS, None
+    return None, None
+
+class TaskRecord:
+    """
+    Compact, read-only view of a task in the assignee data of a space snapshot.
+
+    One record is shared by every assignee of a task. Status, priority and
+    list name repeat across thousands of tasks, so they are interned.
+    Convert with ``to_dict`` only when handing data to templates or jsonify.
+    """
+
+    __slots__ = ("task_id", "task_name", "status", "due_date", "list_name", "priority")
+
+    def __init__(self, task: Dict, list_name: str):
+        self.task_id = task["id"]
+        self.task_name = task["name"]
+        self.status = sys.intern(task["status"]["status"])
+        self.due_date = task.get("due_date", "No due date")
+        self.list_name = sys.intern(list_name)
+        self.priority = sys.intern((task.get("priority") or {}).get("priority", "No priority"))
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TaskRecord":
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            value = data[name]
+            setattr(record, name, sys.intern(value) if name in ("status", "list_name", "priority") else value)
+        return record
+
+def new_assignee_data() -> Dict:
+    """Return an empty assignee structure, keyed by assignee id"""
+    return defaultdict(lambda: {
+        "name": "",
+        "email": "",
+        "username": "",
+        "task_count": 0,
+        "tasks": [],
+        "lists": set()
+    })
+
+def tally_assignees(assignee_data: Dict, task: Dict, list_item: Dict) -> None:
+    """Add a single task to the entry of each of its assignees"""
+    assignees = task.get("assignees", [])
+    if not assignees:
+        return
+
+    # One compact record per task, shared by all of its assignees
+    record = TaskRecord(task, list_item["name"])
+    for assignee in assignees:
+        assignee_id = assignee["id"]
+
+        # Update assignee information
+        assignee_data[assignee_id].update({
+            "name": assignee.get("username", "No username"),
+            "email": assignee.get("email", "No email"),
+            "username": assignee.get("username", "No username")
+        })
+
+        # Update task information
+        assignee_data[assignee_id]["task_count"] += 1
+        assignee_data[assignee_id]["lists"].add(record.list_name)
+        assignee_data[assignee_id]["tasks"].append(record)
+
+def merge_assignee_data(assignee_data: Dict, other: Dict) -> None:
+    """Merge the per-assignee entries of ``other`` into ``assignee_data``"""
+    for assignee_id, data in other.items():
+        entry = assignee_data[assignee_id]
+        entry.update({
+            "name": data["name"],
+            "email": data["email"],
+            "username": data["username"]
+        })
+        entry["task_count"] += data["task_count"]
+        entry["tasks"].extend(data["tasks"])
+        entry["lists"].update(data["lists"])
+
+def finalize_assignee_data(assignee_data: Dict) -> Dict:
+    """Convert list sets to sorted lists for JSON serialization"""
+    for assignee_id in assignee_data:
+        assignee_data[assignee_id]["lists"] = sorted(assignee_data[assignee_id]["lists"])
+    return dict(assignee_data)
+
+def assignee_data_to_json(assignee_data: Dict) -> Dict:
+    """Expand TaskRecords into plain dicts for templates and jsonify"""
+    return {
+        assignee_id: dict(data, tasks=[task.to_dict() for task in data["tasks"]])
+        for assignee_id, data in assignee_data.items()
+    }
+
+def assignee_data_to_pairs(assignee_data: Dict) -> List:
+    """JSON-safe assignee data; id/data pairs keep numeric ids from turning into object keys"""
+    return [[assignee_id, data] for assignee_id, data in assignee_data_to_json(assignee_data).items()]
+
+def assignee_data_from_pairs(pairs: List) -> Dict:
+    """Rebuild assignee data from ``assignee_data_to_pairs``, sharing one TaskRecord per task again"""
+    records: Dict[str, TaskRecord] = {}
+    assignee_data = {}
+    for assignee_id, data in pairs:
+        tasks = [records.setdefault(task["task_id"], TaskRecord.from_dict(task)) for task in data["tasks"]]
+        assignee_data[assignee_id] = dict(data, tasks=tasks)
+    return assignee_data
+
+def created_after_params(days_back: Optional[int]) -> Dict:
+    """Build the ClickUp date filter for tasks created in the last ``days_back`` days"""
+    params = {}
+    if days_back:
+        start_date = datetime.now() - timedelta(days=days_back)
+        params["date_created_gt"] = int(start_date.timestamp() * 1000)
+    return params
+
+class SpaceSnapshot(ClickUpManager):
+    def take(self, space_id: str, days_back: Optional[int] = None) -> Dict:
         """
-        Count tasks in a space with detailed breakdown
+        Crawl a space once and fold it into everything the dashboard and reports need
 
         Args:
             space_id (str): ID of the space to analyze
-            days_back (int, optional): If provided, only count tasks from the last X days
-        """
-        # Initialize counters
-        task_stats = {
-            "total_tasks": 0,
-            "completed_tasks": 0,
-            "open_tasks": 0,
-            "tasks_by_status": {},
-            "tasks_by_priority": {
-                "urgent": 0,
-                "high": 0,
-                "normal": 0,
-                "low": 0,
-                "no_priority": 0
-            },
-            "lists_count": 0,
-            "folders_count": 0
+            days_back (int, optional): If provided, task statistics only cover
+                tasks created in the last X days. Assignee data always covers
+                every task.
+
+        Returns a dict with ``space``, ``task_stats`` and ``assignee_data``.
+        The folder/list/task tree is downloaded exactly once and each task is
+        folded into both the statistics and the assignee data in one pass.
+        """
+        task_stats = new_task_stats()
+        columns = TaskColumns()
+        assignee_data = new_assignee_data()
+        cutoff = created_after_params(days_back).get("date_created_gt")
+        # Per-task rows that seed the webhook-maintained counters
+        task_rows = [] if space_counters else None
+        rollup = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            space_future = executor.submit(self.get_space_details, space_id)
+
+            try:
+                folders, all_lists = self.get_space_hierarchy(space_id, executor)
+
+                list_folds = executor.map(lambda list_item: self._fold_list(columns, list_item, task_rows), all_lists)
+                for assignees in list_folds:
+                    merge_assignee_data(assignee_data, assignees)
+
+                # The days_back window is applied to the columns, not the crawl
+                task_stats = columns.task_stats(created_after=cutoff)
+                task_stats["folders_count"] = len(folders)
+                task_stats["lists_count"] = len(all_lists)
+                rollup = DailyRollup.from_columns(columns)
+            except Exception as e:
+                print(f"Error crawling space: {e}")
+                task_rows = None
+
+            space = space_future.result()
+
+        return {
+            "space": space,
+            "task_stats": task_stats,
+            "assignee_data": finalize_assignee_data(assignee_data),
+            "task_rows": task_rows,
+            "rollup": rollup
         }
 
-        # Set up date filtering if specified
-        params = {}
-        if days_back:
-            start_date = datetime.now() - timedelta(days=days_back)
-            params["date_created_gt"] = int(start_date.timestamp() * 1000)
+    def _fold_list(self, columns: TaskColumns, list_item: Dict, task_rows: Optional[List] = None) -> Dict:
+        """Fold the tasks of a single list into the shared columns and partial assignee data"""
+        assignee_data = new_assignee_data()
+        for task in self.iter_list_tasks(list_item["id"]):
+            columns.append_task(task, list_item["name"])
+            tally_assignees(assignee_data, task, list_item)
+            if task_rows is not None:
+                task_rows.append(task_counter_row(task, list_item))
+        return assignee_data
+
+def _ms(value: Any) -> Optional[int]:
+    """ClickUp timestamps arrive as strings of milliseconds, or null"""
+    return int(value) if value else None
+
+# Columns available to the task export, computed from a raw task and its list
+EXPORT_FIELDS: Dict[str, Callable[[Dict, Dict], Any]] = {
+    "id": lambda task, list_item: task["id"],
+    "custom_id": lambda task, list_item: task.get("custom_id"),
+    "name": lambda task, list_item: task.get("name"),
+    "status": lambda task, list_item: (task.get("status") or {}).get("status"),
+    "priority": lambda task, list_item: priority_key(task.get("priority")),
+    "assignees": lambda task, list_item: [assignee.get("username") for assignee in task.get("assignees", [])],
+    "assignee_ids": lambda task, list_item: [assignee["id"] for assignee in task.get("assignees", [])],
+    "assignee_emails": lambda task, list_item: [assignee.get("email") for assignee in task.get("assignees", [])],
+    "creator": lambda task, list_item: (task.get("creator") or {}).get("username"),
+    "tags": lambda task, list_item: [tag.get("name") for tag in task.get("tags", [])],
+    "list_id": lambda task, list_item: list_item["id"],
+    "list_name": lambda task, list_item: list_item.get("name"),
+    "folder_name": lambda task, list_item: (list_item.get("folder") or {}).get("name"),
+    "parent": lambda task, list_item: task.get("parent"),
+    "date_created": lambda task, list_item: _ms(task.get("date_created")),
+    "date_updated": lambda task, list_item: _ms(task.get("date_updated")),
+    "date_closed": lambda task, list_item: _ms(task.get("date_closed")),
+    "start_date": lambda task, list_item: _ms(task.get("start_date")),
+    "due_date": lambda task, list_item: _ms(task.get("due_date")),
+    "time_estimate": lambda task, list_item: task.get("time_estimate"),
+    "url": lambda task, list_item: task.get("url")
+}
+DEFAULT_EXPORT_FIELDS = (
+    "id", "name", "status", "priority", "assignees", "list_name",
+    "date_created", "date_updated", "due_date", "url"
+)
+
+class SpaceTaskExporter(ClickUpManager):
+    """
+    Streams every task of a space, list by list and page by page.
+
+    Lists are read one after the other through ``iter_list_tasks``, so at
+    most two pages of tasks (or one store batch) are held at a time,
+    however large the space.
+    """
+
+    def get_space_lists(self, space_id: str) -> List[Dict]:
+        """Every list in a space, folderless lists first"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return self.get_space_hierarchy(space_id, executor)[1]
+
+    def iter_rows(self, lists: List[Dict], fields: Sequence[str], created_after: Optional[int] = None,
+                  created_before: Optional[int] = None) -> Iterator[List]:
+        """Yield the selected fields of each task created in the window (milliseconds, exclusive)"""
+        extractors = [EXPORT_FIELDS[field] for field in fields]
+        for list_item in lists:
+            for task in self.iter_list_tasks(list_item["id"], created_after):
+                if created_before is not None and int(task.get("date_created") or 0) >= created_before:
+                    continue
+                yield [extract(task, list_item) for extract in extractors]
+
+def export_ndjson(rows: Iterator[List], fields: Sequence[str], batch_size: int = 100) -> Iterator[str]:
+    """Encode rows as one JSON object per line, yielding ``batch_size`` lines at a time"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(fields, row))))
+        if len(lines) >= batch_size:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+def export_csv(rows: Iterator[List], fields: Sequence[str], batch_size: int = 100) -> Iterator[str]:
+    """Encode rows as CSV with a header, yielding ``batch_size`` rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for count, row in enumerate(rows, 1):
+        # Multi-valued fields share one cell
+        writer.writerow(["; ".join(str(item) for item in value) if isinstance(value, list) else value for value in row])
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def export_ndjson_error(message: str) -> str:
+    """A last NDJSON line telling readers the export stopped early"""
+    return json.dumps({"error": message}) + "\n"
+
+def export_csv_error(message: str) -> str:
+    """A last CSV row, marked ``#error`` in its first cell, telling readers the export stopped early"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(["#error", message])
+    return buffer.getvalue()
+
+EXPORT_FORMATS = {
+    "ndjson": (export_ndjson, export_ndjson_error, "application/x-ndjson"),
+    "csv": (export_csv, export_csv_error, "text/csv")
+}
 
+class AsyncRunner:
+    """
+    A single background event loop shared by every request in the process.
+
+    Synchronous code (Flask views) hands coroutines to ``run``; the aiohttp
+    sessions live on this loop, so connections are pooled across requests.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="clickup-async", daemon=True).start()
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the shared loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+async_runner = AsyncRunner()
+_async_sessions: Dict[str, "aiohttp.ClientSession"] = {}
+# Requests in flight per aiohttp session, and sessions dropped from the pool that close once idle
+_async_in_flight: Dict["aiohttp.ClientSession", int] = {}
+_retired_async_sessions: set = set()
+
+def get_async_session(api_token: str) -> "aiohttp.ClientSession":
+    """Return the pooled aiohttp session for an API token; call from the shared loop only"""
+    if aiohttp is None:
+        raise RuntimeError("The asyncio ClickUp client requires aiohttp")
+    http = _async_sessions.get(api_token)
+    if http is None or http.closed:
+        http = aiohttp.ClientSession(
+            headers={
+                "Authorization": api_token,
+                "Content-Type": "application/json"
+            },
+            connector=aiohttp.TCPConnector(limit_per_host=HTTP_POOL_SIZE),
+            timeout=aiohttp.ClientTimeout(connect=HTTP_TIMEOUT[0], sock_read=HTTP_TIMEOUT[1])
+        )
+        _async_sessions[api_token] = http
+    return http
+
+@contextlib.asynccontextmanager
+async def borrow_async_session(api_token: str) -> AsyncIterator["aiohttp.ClientSession"]:
+    """Lend the pooled aiohttp session of a token for one request; call from the shared loop only"""
+    http = get_async_session(api_token)
+    _async_in_flight[http] = _async_in_flight.get(http, 0) + 1
+    try:
+        yield http
+    finally:
+        _async_in_flight[http] -= 1
+        if not _async_in_flight[http]:
+            del _async_in_flight[http]
+            if http in _retired_async_sessions:
+                _retired_async_sessions.discard(http)
+                await http.close()
+
+async def retire_async_session(api_token: str) -> None:
+    """Drop a token's aiohttp session from the pool, closing it once its requests finish; run on the shared loop"""
+    http = _async_sessions.pop(api_token, None)
+    if http is None:
+        return
+    if _async_in_flight.get(http):
+        _retired_async_sessions.add(http)
+    else:
+        await http.close()
+
+async def close_async_sessions() -> None:
+    """Close every pooled or retired aiohttp session; run on the shared loop"""
+    while _async_sessions:
+        _, http = _async_sessions.popitem()
+        await http.close()
+    while _retired_async_sessions:
+        await _retired_async_sessions.pop().close()
+
+def close_async_sessions_at_exit() -> None:
+    """Close the aiohttp sessions left at shutdown, while the shared loop still runs"""
+    if _async_sessions or _retired_async_sessions:
         try:
-            # Get folders in space
-            folders = self.get_folders_in_space(space_id)
-            task_stats["folders_count"] = len(folders)
+            async_runner.run(close_async_sessions(), timeout=5)
+        except Exception as e:
+            print(f"Error closing async sessions: {e}")
 
-            # Process folderless lists
-            space_lists = self.get_lists_in_space(space_id)
-            all_lists = space_lists.copy()
+atexit.register(close_async_sessions_at_exit)
 
-            # Process folders and their lists
-            for folder in folders:
-                folder_lists = self.get_folder_lists(folder["id"])
-                all_lists.extend(folder_lists)
+class AsyncClickUpManager:
+    """asyncio counterpart of ClickUpManager with the same method surface"""
 
-            task_stats["lists_count"] = len(all_lists)
+    def __init__(self, api_token: str, max_workers: Optional[int] = None):
+        self.api_token = api_token
+        self.max_workers = max(1, max_workers or CRAWL_MAX_WORKERS)
+        self.base_url = CLICKUP_BASE_URL
+        self.semaphore = asyncio.Semaphore(self.max_workers)
+
+    async def _get(self, path: str, params: Optional[Dict] = None) -> Dict:
+        """Issue a GET against the ClickUp API, paced by the shared rate limiter"""
+        async with self.semaphore, borrow_async_session(self.api_token) as http:
+            for attempt in range(RATE_LIMIT_MAX_ATTEMPTS):
+                if rate_limiter:
+                    waited = time.perf_counter()
+                    await asyncio.to_thread(rate_limiter.acquire, self.api_token)
+                    observe_duration("clickup_rate_limit_wait_seconds", waited)
+                started = time.perf_counter()
+                try:
+                    async with http.get(f"{self.base_url}{path}", params=params) as response:
+                        body = await response.read()
+                        observe_clickup_call(path, str(response.status), time.perf_counter() - started, len(body))
+                        if rate_limiter:
+                            await asyncio.to_thread(rate_limiter.observe, self.api_token, response.status, response.headers)
+                        if response.status == 429 and attempt < RATE_LIMIT_MAX_ATTEMPTS - 1:
+                            delay = RateLimitScheduler.backoff(attempt, response.headers)
+                        else:
+                            response.raise_for_status()
+                            return json.loads(body)
+                except aiohttp.ClientConnectionError:
+                    observe_clickup_call(path, "error", time.perf_counter() - started)
+                    raise
+                await asyncio.sleep(delay)
+
+    async def _cached(self, endpoint: str, resource_id: str, path: str, key: Optional[str]) -> Any:
+        """Serve a hierarchy endpoint through the shared TTL cache"""
+        hit, value = hierarchy_cache.lookup(self.api_token, endpoint, resource_id)
+        if not hit:
+            data = await self._get(path)
+            value = data[key] if key else data
+            hierarchy_cache.store(self.api_token, endpoint, resource_id, value)
+        return value
+
+    async def get_all_teams(self) -> List[Dict]:
+        """Get all teams (workspaces) the user has access to"""
+        return await self._cached("teams", "", "/team", "teams")
+
+    async def get_spaces_in_team(self, team_id: str) -> List[Dict]:
+        """Get all spaces within a specific team"""
+        return await self._cached("spaces", team_id, f"/team/{team_id}/space", "spaces")
+
+    async def get_lists_in_space(self, space_id: str) -> List[Dict]:
+        """Get all lists within a space"""
+        return await self._cached("lists", space_id, f"/space/{space_id}/list", "lists")
+
+    async def get_folder_lists(self, folder_id: str) -> List[Dict]:
+        """Get all lists within a folder"""
+        return await self._cached("folder_lists", folder_id, f"/folder/{folder_id}/list", "lists")
+
+    async def get_folders_in_space(self, space_id: str) -> List[Dict]:
+        """Get all folders within a space"""
+        return await self._cached("folders", space_id, f"/space/{space_id}/folder", "folders")
 
-            # Process all lists
-            for list_item in all_lists:
-                tasks = self.get_tasks_in_list(list_item["id"], params)
+    async def get_space_details(self, space_id: str) -> Dict:
+        """Get space information"""
+        return await self._cached("space", space_id, f"/space/{space_id}", None)
 
-                for task in tasks:
-                    task_stats["total_tasks"] += 1
+    async def get_task_page(self, list_id: str, params: Optional[Dict] = None, page: int = 0) -> Dict:
+        """Get a single page of tasks within a list, including its last_page flag"""
+        page_params = dict(params or {})
+        page_params["page"] = page
+        return await self._get(f"/list/{list_id}/task", page_params)
 
-                    # Count by status
-                    status = task["status"]["status"]
-                    task_stats["tasks_by_status"][status] = task_stats["tasks_by_status"].get(status, 0) + 1
+    async def iter_task_pages(self, list_id: str, params: Optional[Dict] = None) -> AsyncIterator[List[Dict]]:
+        """Stream the task pages of a list, requesting page N+1 while page N is consumed"""
+        page = 0
+        pending = asyncio.ensure_future(self.get_task_page(list_id, params, page))
+        while pending is not None:
+            data = await pending
+            tasks = data.get("tasks", [])
+            pending = None
+            if tasks and not data.get("last_page", True):
+                page += 1
+                pending = asyncio.ensure_future(self.get_task_page(list_id, params, page))
+            yield tasks
 
-                    if status.lower() in ["complete", "completed", "done"]:
-                        task_stats["completed_tasks"] += 1
-                    else:
-                        task_stats["open_tasks"] += 1
+    async def iter_tasks(self, list_id: str, params: Optional[Dict] = None) -> AsyncIterator[Dict]:
+        """Stream every task within a list, page by page"""
+        async for tasks in self.iter_task_pages(list_id, params):
+            for task in tasks:
+                yield task
+
+    async def get_tasks_in_list(self, list_id: str, params: Optional[Dict] = None) -> List[Dict]:
+        """Get all tasks within a list, across every page"""
+        return [task async for task in self.iter_tasks(list_id, params)]
+
+    async def fold_list_tasks(self, list_id: str, fold: Callable[[Dict], None], created_after: Optional[int] = None) -> None:
+        """
+        Feed every task of a list to ``fold``
+
+        Mirrors ClickUpManager.iter_list_tasks: with the task store enabled the
+        list is synced incrementally and read back from SQLite off the loop.
+        """
+        if task_store is None:
+            params = {"date_created_gt": created_after} if created_after else None
+            async for task in self.iter_tasks(list_id, params):
+                fold(task)
+            return
+
+        state = await asyncio.to_thread(task_store.begin_sync, self.api_token, list_id)
+        async for tasks in self.iter_task_pages(list_id, state["params"]):
+            await asyncio.to_thread(task_store.store_tasks, state, tasks)
+        await asyncio.to_thread(task_store.finish_sync, state)
+
+        def replay():
+            for task in task_store.iter_tasks(self.api_token, list_id, created_after):
+                fold(task)
+        await asyncio.to_thread(replay)
+
+    async def get_space_hierarchy(self, space_id: str) -> Tuple[List[Dict], List[Dict]]:
+        """Get the folders of a space and every list in it, folderless lists first"""
+        folders, space_lists = await asyncio.gather(
+            self.get_folders_in_space(space_id),
+            self.get_lists_in_space(space_id)
+        )
+        all_lists = space_lists.copy()
+        for folder_lists in await asyncio.gather(*(self.get_folder_lists(folder["id"]) for folder in folders)):
+            all_lists.extend(folder_lists)
+        return folders, all_lists
+
+class AsyncSpaceSnapshot(AsyncClickUpManager):
+    async def take(self, space_id: str, days_back: Optional[int] = None) -> Dict:
+        """asyncio variant of SpaceSnapshot.take"""
+        task_stats = new_task_stats()
+        columns = TaskColumns()
+        assignee_data = new_assignee_data()
+        cutoff = created_after_params(days_back).get("date_created_gt")
+        task_rows = [] if space_counters else None
+        rollup = None
+
+        async def fold_list(list_item: Dict) -> Dict:
+            partial = new_assignee_data()
+
+            def fold(task: Dict) -> None:
+                columns.append_task(task, list_item["name"])
+                tally_assignees(partial, task, list_item)
+                if task_rows is not None:
+                    task_rows.append(task_counter_row(task, list_item))
+
+            await self.fold_list_tasks(list_item["id"], fold)
+            return partial
+
+        space_future = asyncio.ensure_future(self.get_space_details(space_id))
+        try:
+            folders, all_lists = await self.get_space_hierarchy(space_id)
 
-                    # Count by priority
-                    priority = task.get("priority")
-                    if priority:
-                        priority_name = priority["priority"].lower()
-                        task_stats["tasks_by_priority"][priority_name] += 1
-                    else:
-                        task_stats["tasks_by_priority"]["no_priority"] += 1
+            # gather() keeps list order, so the merge is deterministic
+            for partial in await asyncio.gather(*(fold_list(list_item) for list_item in all_lists)):
+                merge_assignee_data(assignee_data, partial)
 
-            return task_stats
+            task_stats = columns.task_stats(created_after=cutoff)
+            task_stats["folders_count"] = len(folders)
+            task_stats["lists_count"] = len(all_lists)
+            rollup = DailyRollup.from_columns(columns)
         except Exception as e:
-            print(f"Error counting tasks: {e}")
-            return task_stats
-
-class SpaceAssigneeTracker(ClickUpManager):
-    def get_space_assignees(self, space_id: str) -> Dict:
-        """
-        Get all assignees and their tasks in a specific space
-        """
-        # Initialize data structure for assignees
-        assignee_data = defaultdict(lambda: {
-            "name": "",
-            "email": "",
-            "username": "",
-            "task_count": 0,
-            "tasks": [],
-            "lists": set()
+            print(f"Error crawling space: {e}")
+            task_rows = None
+
+        return {
+            "space": await space_future,
+            "task_stats": task_stats,
+            "assignee_data": finalize_assignee_data(assignee_data),
+            "task_rows": task_rows,
+            "rollup": rollup
+        }
+
+def crawl_space(api_token: str, space_id: str, days_back: Optional[int] = None) -> Dict:
+    """Crawl a space with the asyncio client when enabled, else with threads"""
+    started = time.perf_counter()
+    if USE_ASYNC_CLIENT:
+        snapshot = async_runner.run(AsyncSpaceSnapshot(api_token).take(space_id, days_back))
+    else:
+        snapshot = SpaceSnapshot(api_token).take(space_id, days_back)
+    observe_duration("space_crawl_seconds", started, {"client": "async" if USE_ASYNC_CLIENT else "threads"})
+
+    # A complete crawl (re)seeds the webhook-maintained counters of the space
+    task_rows = snapshot.pop("task_rows", None)
+    if space_counters and task_rows is not None:
+        try:
+            space_counters.seed(api_token, snapshot, task_rows)
+        except sqlite3.Error as e:
+            print(f"Error seeding space counters: {e}")
+    return snapshot
+
+def snapshot_to_json(snapshot: Dict) -> Dict:
+    """JSON-safe form of a crawl_space snapshot, for sharing it with other workers"""
+    rollup = snapshot.get("rollup")
+    return dict(
+        snapshot,
+        assignee_data=assignee_data_to_pairs(snapshot["assignee_data"]),
+        rollup=rollup.to_json() if rollup is not None else None
+    )
+
+def snapshot_from_json(data: Dict) -> Dict:
+    """Rebuild a snapshot from ``snapshot_to_json`` output"""
+    rollup = data.get("rollup")
+    return dict(
+        data,
+        assignee_data=assignee_data_from_pairs(data["assignee_data"]),
+        rollup=DailyRollup.from_json(rollup) if rollup is not None else None
+    )
+
+def take_snapshot(api_token: str, space_id: str, days_back: Optional[int] = None) -> Dict:
+    """Take a space snapshot, sharing the crawl with identical snapshots already in flight"""
+    snapshot = dict(crawl_flights.do(
+        flight_key(api_token, "snapshot", space_id, days_back),
+        lambda: crawl_space(api_token, space_id, days_back),
+        snapshot_to_json,
+        snapshot_from_json
+    ))
+
+    # A complete crawl is bucketed by creation day, so other windows are served without crawling again
+    rollup = snapshot.pop("rollup", None)
+    if rollup is not None:
+        rollup_cache.store(api_token, "rollup", space_id, {
+            "space": snapshot["space"],
+            "folders_count": snapshot["task_stats"]["folders_count"],
+            "lists_count": snapshot["task_stats"]["lists_count"],
+            "assignee_data": snapshot["assignee_data"],
+            "rollup": rollup
         })
+    return snapshot
+
+class TeamRollup:
+    """
+    Running merge of space snapshots into team-wide task statistics and workloads.
+
+    Assignees are keyed by their ClickUp id, so someone working in several
+    spaces gets one workload entry with a task count per space.
+    """
+
+    def __init__(self):
+        self.task_stats = new_task_stats()
+        self.task_stats["spaces_count"] = 0
+        self.workloads: Dict[Any, Dict] = {}
+
+    def add(self, snapshot: Dict) -> Dict:
+        """Merge one space snapshot and return its compact per-space summary"""
+        space = snapshot["space"]
+        space_stats = snapshot["task_stats"]
+
+        self.task_stats["spaces_count"] += 1
+        for field in ("total_tasks", "completed_tasks", "open_tasks", "lists_count", "folders_count"):
+            self.task_stats[field] += space_stats.get(field, 0)
+        for breakdown in ("tasks_by_status", "tasks_by_priority"):
+            for name, count in space_stats[breakdown].items():
+                self.task_stats[breakdown][name] = self.task_stats[breakdown].get(name, 0) + count
+
+        assignees = []
+        for assignee_id, data in snapshot["assignee_data"].items():
+            workload = self.workloads.setdefault(assignee_id, {
+                "id": assignee_id,
+                "name": data["name"],
+                "email": data["email"],
+                "task_count": 0,
+                "spaces": {}
+            })
+            workload["task_count"] += data["task_count"]
+            workload["spaces"][space.get("id")] = data["task_count"]
+            assignees.append({"id": assignee_id, "name": data["name"], "email": data["email"],
+                              "task_count": data["task_count"]})
+
+        return {
+            "space": {"id": space.get("id"), "name": space.get("name", "Unknown Space")},
+            "task_stats": space_stats,
+            "assignees": sorted(assignees, key=lambda assignee: -assignee["task_count"])
+        }
+
+    def to_json(self) -> Dict:
+        """Team statistics and workloads, busiest assignees first"""
+        return {
+            "task_stats": self.task_stats,
+            "workloads": sorted(self.workloads.values(), key=lambda workload: (-workload["task_count"], workload["name"]))
+        }
+
+def iter_team_snapshots(api_token: str, spaces: List[Dict], days_back: Optional[int] = None) -> Iterator[Tuple[Dict, Optional[Dict], Optional[str]]]:
+    """
+    Crawl the spaces of a team concurrently and yield ``(space, snapshot, error)`` as each finishes
+
+    Snapshots come from live_snapshot, so spaces with a fresh rollup are not
+    crawled again and every ``days_back`` window shares one crawl. At most
+    TEAM_MAX_WORKERS spaces are crawled at once. Closing the iterator early
+    cancels the spaces that have not started yet.
+    """
+    first_day, last_day = created_days(days_back)
+    executor = ThreadPoolExecutor(max_workers=max(1, TEAM_MAX_WORKERS), thread_name_prefix="team")
+    try:
+        futures = {
+            executor.submit(live_snapshot, api_token, space["id"], first_day, last_day): space
+            for space in spaces
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                print(f"Error crawling space {futures[future]['id']}: {e}")
+                yield futures[future], None, str(e)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def task_counter_row(task: Dict, list_item: Dict) -> Tuple:
+    """The contribution of one task to the space counters"""
+    return (
+        task["id"],
+        list_item["id"],
+        list_item.get("name", ""),
+        task["status"]["status"],
+        priority_key(task.get("priority")),
+        int(task.get("date_created") or 0),
+        [(str(assignee["id"]), assignee.get("username", "No username"), assignee.get("email", "No email"))
+         for assignee in task.get("assignees", [])]
+    )
+
+class SpaceCounters:
+    """
+    Per-space status, priority and assignee counters kept fresh by webhooks.
+
+    A complete crawl seeds a space: each task's contribution (status,
+    priority, assignees, list, creation time) is stored next to running
+    counts per dimension. Webhook events then swap one task's contribution
+    at a time, subtracting its old values from the counts and adding the
+    new ones, so dashboards are served without calling ClickUp. A space is
+    only served to tokens that have crawled it, and is re-seeded once its
+    seed is older than ``max_age`` seconds.
+    """
+
+    def __init__(self, db_path: str, max_age: int = 6 * 3600):
+        self.db_path = db_path
+        self.max_age = max_age
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with connect_sqlite(self.db_path, autocommit=True) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS spaces ("
+                "space_id TEXT PRIMARY KEY, data TEXT NOT NULL, folders_count INTEGER NOT NULL, "
+                "lists_count INTEGER NOT NULL, seeded_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS space_access (space_id TEXT NOT NULL, owner TEXT NOT NULL, "
+                "PRIMARY KEY (space_id, owner))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS space_tasks ("
+                "task_id TEXT PRIMARY KEY, space_id TEXT NOT NULL, list_id TEXT NOT NULL, list_name TEXT NOT NULL, "
+                "status TEXT NOT NULL, priority TEXT NOT NULL, date_created INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS space_tasks_by_space ON space_tasks (space_id, date_created)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS task_assignees (task_id TEXT NOT NULL, assignee_id TEXT NOT NULL, "
+                "PRIMARY KEY (task_id, assignee_id))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS space_assignees ("
+                "space_id TEXT NOT NULL, assignee_id TEXT NOT NULL, name TEXT NOT NULL, email TEXT NOT NULL, "
+                "PRIMARY KEY (space_id, assignee_id))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS space_counts ("
+                "space_id TEXT NOT NULL, dimension TEXT NOT NULL, value TEXT NOT NULL, count INTEGER NOT NULL, "
+                "PRIMARY KEY (space_id, dimension, value))"
+            )
+
+    @staticmethod
+    def _assignee_id(value: str) -> Any:
+        # Stored as text; ClickUp's numeric ids come back as ints, as in SpaceSnapshot
+        return int(value) if value.isdigit() else value
+
+    @staticmethod
+    def _contribution(status: str, priority: str, assignee_ids: List[str]) -> List[Tuple[str, str]]:
+        return [("status", status), ("priority", priority)] + [("assignee", assignee_id) for assignee_id in assignee_ids]
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, space_id: str, contribution: List[Tuple[str, str]], delta: int) -> None:
+        conn.executemany(
+            "INSERT INTO space_counts (space_id, dimension, value, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (space_id, dimension, value) DO UPDATE SET count = count + excluded.count",
+            [(space_id, dimension, value, delta) for dimension, value in contribution]
+        )
+        conn.execute("DELETE FROM space_counts WHERE space_id = ? AND count <= 0", (space_id,))
+
+    def _remove(self, conn: sqlite3.Connection, task_id: str) -> Optional[str]:
+        """Subtract a task's stored contribution and forget it; returns its space id"""
+        row = conn.execute("SELECT space_id, status, priority FROM space_tasks WHERE task_id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        space_id, status, priority = row
+        assignee_ids = [assignee_id for (assignee_id,) in conn.execute(
+            "SELECT assignee_id FROM task_assignees WHERE task_id = ?", (task_id,)
+        )]
+        self._bump(conn, space_id, self._contribution(status, priority, assignee_ids), -1)
+        conn.execute("DELETE FROM space_tasks WHERE task_id = ?", (task_id,))
+        conn.execute("DELETE FROM task_assignees WHERE task_id = ?", (task_id,))
+        return space_id
+
+    def _insert(self, conn: sqlite3.Connection, space_id: str, row: Tuple) -> None:
+        """Store a task's contribution and add it to the counts"""
+        task_id, list_id, list_name, status, priority, date_created, assignees = row
+        conn.execute(
+            "INSERT OR REPLACE INTO space_tasks (task_id, space_id, list_id, list_name, status, priority, date_created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (task_id, space_id, list_id, list_name, status, priority, date_created)
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO task_assignees (task_id, assignee_id) VALUES (?, ?)",
+            [(task_id, assignee_id) for assignee_id, _, _ in assignees]
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO space_assignees (space_id, assignee_id, name, email) VALUES (?, ?, ?, ?)",
+            [(space_id, assignee_id, name, email) for assignee_id, name, email in assignees]
+        )
+        self._bump(conn, space_id, self._contribution(status, priority, [assignee[0] for assignee in assignees]), 1)
+
+    def _touch(self, conn: sqlite3.Connection, space_id: str) -> None:
+        conn.execute("UPDATE spaces SET updated_at = ? WHERE space_id = ?", (time.time(), space_id))
 
+    def seed(self, api_token: str, snapshot: Dict, task_rows: List[Tuple]) -> None:
+        """Replace a space's counters with the result of a complete crawl"""
+        space = snapshot["space"]
+        space_id = str(space["id"])
+        conn = connect_sqlite(self.db_path, autocommit=True)
         try:
-            # Get space details
-            space = self.get_space_details(space_id)
-
-            # Get all lists in the space
-            lists = self.get_lists_in_space(space_id)
-
-            for list_item in lists:
-                tasks = self.get_tasks_in_list(list_item['id'])
-
-                for task in tasks:
-                    for assignee in task.get("assignees", []):
-                        assignee_id = assignee["id"]
-
-                        # Update assignee information
-                        assignee_data[assignee_id].update({
-                            "name": assignee.get("username", "No username"),
-                            "email": assignee.get("email", "No email"),
-                            "username": assignee.get("username", "No username")
-                        })
-
-                        # Update task information
-                        assignee_data[assignee_id]["task_count"] += 1
-                        assignee_data[assignee_id]["lists"].add(list_item["name"])
-
-                        # Add task details
-                        task_info = {
-                            "task_id": task["id"],
-                            "task_name": task["name"],
-                            "status": task["status"]["status"],
-                            "due_date": task.get("due_date", "No due date"),
-                            "list_name": list_item["name"],
-                            "priority": task.get("priority", {}).get("priority", "No priority")
-                        }
-                        assignee_data[assignee_id]["tasks"].append(task_info)
-
-            # Convert sets to lists for JSON serialization
-            for assignee_id in assignee_data:
-                assignee_data[assignee_id]["lists"] = list(assignee_data[assignee_id]["lists"])
-
-            return dict(assignee_data)
-        except Exception as e:
-            print(f"Error retrieving assignees: {e}")
-            return {}
+            conn.execute("BEGIN IMMEDIATE")
+            task_ids = [(task_id,) for (task_id,) in conn.execute(
+                "SELECT task_id FROM space_tasks WHERE space_id = ?", (space_id,)
+            )]
+            conn.executemany("DELETE FROM task_assignees WHERE task_id = ?", task_ids)
+            for table in ("space_tasks", "space_assignees", "space_counts"):
+                conn.execute(f"DELETE FROM {table} WHERE space_id = ?", (space_id,))
+
+            counts: Dict[Tuple[str, str], int] = defaultdict(int)
+            for task_id, list_id, list_name, status, priority, date_created, assignees in task_rows:
+                # A task moved between spaces since its last event belongs to this crawl now
+                self._remove(conn, task_id)
+                conn.execute(
+                    "INSERT OR REPLACE INTO space_tasks (task_id, space_id, list_id, list_name, status, priority, date_created) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (task_id, space_id, list_id, list_name, status, priority, date_created)
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO task_assignees (task_id, assignee_id) VALUES (?, ?)",
+                    [(task_id, assignee_id) for assignee_id, _, _ in assignees]
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO space_assignees (space_id, assignee_id, name, email) VALUES (?, ?, ?, ?)",
+                    [(space_id, assignee_id, name, email) for assignee_id, name, email in assignees]
+                )
+                for key in self._contribution(status, priority, [assignee[0] for assignee in assignees]):
+                    counts[key] += 1
+            conn.executemany(
+                "INSERT INTO space_counts (space_id, dimension, value, count) VALUES (?, ?, ?, ?)",
+                [(space_id, dimension, value, count) for (dimension, value), count in counts.items()]
+            )
+
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO spaces (space_id, data, folders_count, lists_count, seeded_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (space_id, json.dumps(space), snapshot["task_stats"].get("folders_count", 0),
+                 snapshot["task_stats"].get("lists_count", 0), now, now)
+            )
+            conn.execute("INSERT OR IGNORE INTO space_access (space_id, owner) VALUES (?, ?)", (space_id, token_key(api_token)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def apply_task(self, task: Dict) -> bool:
+        """
+        Swap in the current state of a task fetched from ClickUp; False if its space is not tracked
+
+        Closed tasks are only removed: crawls leave them out, as ClickUp does by default.
+        """
+        space_id = str((task.get("space") or {}).get("id", ""))
+        conn = connect_sqlite(self.db_path, autocommit=True)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            previous_space = self._remove(conn, task["id"])
+            tracked = conn.execute("SELECT 1 FROM spaces WHERE space_id = ?", (space_id,)).fetchone() is not None
+            if tracked and (task.get("status") or {}).get("type") != "closed":
+                self._insert(conn, space_id, task_counter_row(task, task.get("list") or {"id": "", "name": ""}))
+            if tracked:
+                self._touch(conn, space_id)
+            if previous_space and previous_space != space_id:
+                self._touch(conn, previous_space)
+            conn.execute("COMMIT")
+            return tracked or previous_space is not None
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def apply_changes(self, task_id: str, history_items: List[Dict]) -> bool:
+        """
+        Apply the status, priority and assignee changes of a webhook event
+
+        Returns False when the task is not tracked or the event changes
+        something the counters cannot derive (such as its list), in which
+        case the caller should fetch the task and use ``apply_task``. A
+        status change to a closed status removes the task, as in a crawl;
+        reopening it then finds it untracked and fetches it.
+        """
+        conn = connect_sqlite(self.db_path, autocommit=True)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT space_id, list_id, list_name, status, priority, date_created FROM space_tasks WHERE task_id = ?",
+                (task_id,)
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return False
+            space_id, list_id, list_name, status, priority, date_created = row
+            names = {assignee_id: (name, email) for assignee_id, name, email in conn.execute(
+                "SELECT assignee_id, name, email FROM space_assignees WHERE space_id = ?", (space_id,)
+            )}
+            assignee_ids = [assignee_id for (assignee_id,) in conn.execute(
+                "SELECT assignee_id FROM task_assignees WHERE task_id = ?", (task_id,)
+            )]
+
+            closed = False
+            for item in history_items:
+                field = item.get("field")
+                before, after = item.get("before"), item.get("after")
+                if field == "status" and isinstance(after, dict) and after.get("status"):
+                    status = after["status"]
+                    closed = after.get("type") == "closed"
+                elif field == "priority":
+                    priority = priority_key(after if isinstance(after, dict) else None)
+                elif field == "assignee_add" and isinstance(after, dict):
+                    assignee_id = str(after["id"])
+                    names[assignee_id] = (after.get("username", "No username"), after.get("email", "No email"))
+                    if assignee_id not in assignee_ids:
+                        assignee_ids.append(assignee_id)
+                elif field == "assignee_rem" and isinstance(before, dict):
+                    assignee_ids = [assignee_id for assignee_id in assignee_ids if assignee_id != str(before["id"])]
+                elif field in ("section_moved", "list", "task_creation"):
+                    conn.execute("ROLLBACK")
+                    return False
+                # Other fields (name, description, due date...) do not affect the counters
+
+            self._remove(conn, task_id)
+            if not closed:
+                assignees = [(assignee_id, *names.get(assignee_id, ("No username", "No email")))
+                             for assignee_id in assignee_ids]
+                self._insert(conn, space_id, (task_id, list_id, list_name, status, priority, date_created, assignees))
+            self._touch(conn, space_id)
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def delete_task(self, task_id: str) -> bool:
+        """Subtract a deleted task from its space's counters"""
+        conn = connect_sqlite(self.db_path, autocommit=True)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            space_id = self._remove(conn, task_id)
+            if space_id:
+                self._touch(conn, space_id)
+            conn.execute("COMMIT")
+            return space_id is not None
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def rollup(self, api_token: str, space_id: str) -> Optional[Dict]:
+        """
+        The space's day-bucketed rollup, or None if the space must be crawled
+
+        Returns the same entry take_snapshot caches under ``rollup``.
+        Assignee entries carry names, counts and lists but no task records.
+        """
+        conn = connect_sqlite(self.db_path, autocommit=True)
+        try:
+            row = conn.execute(
+                "SELECT s.data, s.folders_count, s.lists_count, s.seeded_at FROM spaces s "
+                "JOIN space_access a ON a.space_id = s.space_id WHERE s.space_id = ? AND a.owner = ?",
+                (space_id, token_key(api_token))
+            ).fetchone()
+            if row is None or time.time() - row[3] >= self.max_age:
+                return None
+            data, folders_count, lists_count, _ = row
+
+            day_counts: Dict[str, Dict[Tuple[int, Any], int]] = {dimension: {} for dimension in DailyRollup.DIMENSIONS}
+            for day, status, priority, count in conn.execute(
+                "SELECT date_created / ?, status, priority, COUNT(*) FROM space_tasks WHERE space_id = ? "
+                "GROUP BY 1, 2, 3",
+                (DAY_MS, space_id)
+            ):
+                day_counts["status"][(day, status)] = day_counts["status"].get((day, status), 0) + count
+                day_counts["priority"][(day, priority)] = day_counts["priority"].get((day, priority), 0) + count
+            for day, assignee_id, count in conn.execute(
+                "SELECT t.date_created / ?, a.assignee_id, COUNT(*) FROM task_assignees a "
+                "JOIN space_tasks t ON t.task_id = a.task_id WHERE t.space_id = ? GROUP BY 1, 2",
+                (DAY_MS, space_id)
+            ):
+                day_counts["assignee"][(day, self._assignee_id(assignee_id))] = count
+
+            # Assignee workloads always cover every task, as in SpaceSnapshot
+            lists: Dict[str, List[str]] = defaultdict(list)
+            for assignee_id, list_name in conn.execute(
+                "SELECT DISTINCT a.assignee_id, t.list_name FROM task_assignees a "
+                "JOIN space_tasks t ON t.task_id = a.task_id WHERE t.space_id = ? ORDER BY t.list_name",
+                (space_id,)
+            ):
+                lists[self._assignee_id(assignee_id)].append(list_name)
+            assignee_data = {}
+            for assignee_id, name, email, count in conn.execute(
+                "SELECT a.assignee_id, a.name, a.email, c.count FROM space_counts c "
+                "JOIN space_assignees a ON a.space_id = c.space_id AND a.assignee_id = c.value "
+                "WHERE c.space_id = ? AND c.dimension = 'assignee' ORDER BY c.count DESC, a.name",
+                (space_id,)
+            ):
+                assignee_id = self._assignee_id(assignee_id)
+                assignee_data[assignee_id] = {
+                    "name": name,
+                    "email": email,
+                    "username": name,
+                    "task_count": count,
+                    "tasks": [],
+                    "lists": lists.get(assignee_id, [])
+                }
+        finally:
+            conn.close()
+
+        return {
+            "space": json.loads(data),
+            "folders_count": folders_count,
+            "lists_count": lists_count,
+            "assignee_data": assignee_data,
+            "rollup": DailyRollup(day_counts)
+        }
+
+space_counters = (
+    SpaceCounters(os.path.join(DATA_DIR, "space_counters.db"), SPACE_COUNTERS_MAX_AGE)
+    if WEBHOOK_SECRET else None
+)
+
+def cached_rollup(api_token: str, space_id: str, with_tasks: bool = False) -> Optional[Dict]:
+    """
+    The rollup entry of a space from the webhook-maintained counters or the cache, without crawling
+
+    The counters keep no task records, so they are skipped when
+    ``with_tasks`` asks for assignee entries that carry them.
+    """
+    entry = space_counters.rollup(api_token, space_id) if space_counters and not with_tasks else None
+    if entry is None:
+        _, entry = rollup_cache.lookup(api_token, "rollup", space_id)
+    return entry
+
+def live_snapshot(api_token: str, space_id: str, first_day: Optional[int] = None,
+                  last_day: Optional[int] = None, with_tasks: bool = False) -> Dict:
+    """
+    A space snapshot for tasks created between two days (see created_days)
+
+    The statistics are summed from the space's day-bucketed rollup, so a
+    new window does not crawl again while the rollup is fresh. The rollup
+    is included under ``rollup``, or None if the crawl failed. With
+    ``with_tasks`` the assignee entries carry their task records.
+    """
+    entry = cached_rollup(api_token, space_id, with_tasks)
+    if entry is None:
+        snapshot = take_snapshot(api_token, space_id)
+        entry = cached_rollup(api_token, space_id, with_tasks)
+        if entry is None:
+            return dict(snapshot, rollup=None)
+
+    task_stats = entry["rollup"].task_stats(first_day, last_day)
+    task_stats["folders_count"] = entry["folders_count"]
+    task_stats["lists_count"] = entry["lists_count"]
+    return {
+        "space": entry["space"],
+        "task_stats": task_stats,
+        "assignee_data": entry["assignee_data"],
+        "rollup": entry["rollup"]
+    }
+
+prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_MAX_WORKERS, thread_name_prefix="dashboard-prefetch")
+
+def prefetch_snapshot(api_token: str, space_id: str) -> None:
+    """Crawl a space ahead of the dashboard's section requests, which then join the crawl in flight"""
+    try:
+        live_snapshot(api_token, space_id)
+    except Exception as e:
+        print(f"Error prefetching space: {e}")
+
+WEBHOOK_TASK_EVENTS = (
+    "taskCreated", "taskUpdated", "taskDeleted", "taskStatusUpdated",
+    "taskPriorityUpdated", "taskAssigneeUpdated", "taskMoved"
+)
+
+def verify_webhook_signature(body: bytes, signature: str) -> bool:
+    """Check the X-Signature header: the hex HMAC-SHA256 of the raw body under a webhook secret"""
+    for secret in filter(None, (secret.strip() for secret in WEBHOOK_SECRET.split(","))):
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        if hmac.compare_digest(expected, signature or ""):
+            return True
+    return False
+
+def apply_webhook_event(payload: Dict) -> str:
+    """
+    Apply one ClickUp task event to the space counters
+
+    Status, priority and assignee changes are applied from the event's
+    history items without calling ClickUp. Created or moved tasks, and
+    tasks the counters do not know yet, are fetched with
+    CLICKUP_WEBHOOK_TOKEN. Returns ``applied``, ``fetched``, ``deleted``
+    or ``ignored``.
+    """
+    event = payload.get("event")
+    task_id = payload.get("task_id")
+    if event not in WEBHOOK_TASK_EVENTS or not task_id:
+        return "ignored"
+
+    if event == "taskDeleted":
+        if task_store:
+            task_store.delete_task(task_id)
+        return "deleted" if space_counters.delete_task(task_id) else "ignored"
+
+    if event not in ("taskCreated", "taskMoved") and space_counters.apply_changes(task_id, payload.get("history_items") or []):
+        return "applied"
+
+    if not WEBHOOK_API_TOKEN:
+        print(f"Ignoring {event} for task {task_id}: set CLICKUP_WEBHOOK_TOKEN to fetch it")
+        return "ignored"
+    task = ClickUpManager(WEBHOOK_API_TOKEN).get_task(task_id)
+    return "fetched" if space_counters.apply_task(task) else "ignored"
+
+class ReportJobStore:
+    """
+    Persisted table of background report jobs.
+
+    Jobs live in SQLite so that any gunicorn worker can answer a status poll,
+    whichever worker is running the job. Each job moves through the stages
+    ``queued``, ``crawl``, ``aggregate``, ``llm`` (AI reports only), ``write``
+    and ``done``; its status is ``queued``, ``running``, ``done`` or ``failed``.
+    """
+
+    FIELDS = ("job_id", "owner", "space_id", "status", "stage", "filename", "error", "created_at", "updated_at")
+
+    def __init__(self, db_path: str, stale_after: int = 3600):
+        self.db_path = db_path
+        self.stale_after = stale_after
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with connect_sqlite(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_jobs ("
+                "job_id TEXT PRIMARY KEY, owner TEXT NOT NULL, space_id TEXT NOT NULL, "
+                "status TEXT NOT NULL, stage TEXT NOT NULL, filename TEXT, error TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            # Jobs of a worker that died mid-run would otherwise poll forever
+            conn.execute(
+                "UPDATE report_jobs SET status = 'failed', error = 'Interrupted' "
+                "WHERE status IN ('queued', 'running') AND updated_at < ?",
+                (time.time() - stale_after,)
+            )
+
+    def create(self, api_token: str, space_id: str) -> str:
+        """Record a new queued job and return its id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with connect_sqlite(self.db_path) as conn:
+            conn.execute(
+                "INSERT INTO report_jobs (job_id, owner, space_id, status, stage, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', 'queued', ?, ?)",
+                (job_id, token_key(api_token), space_id, now, now)
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields) -> None:
+        """Update the status, stage, filename or error of a job"""
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with connect_sqlite(self.db_path) as conn:
+            conn.execute(
+                f"UPDATE report_jobs SET {assignments}, updated_at = ? WHERE job_id = ?",
+                (*fields.values(), time.time(), job_id)
+            )
+
+    def get(self, job_id: str, api_token: str) -> Optional[Dict]:
+        """Return a job if it belongs to the given token"""
+        with connect_sqlite(self.db_path) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM report_jobs WHERE job_id = ? AND owner = ?",
+                (job_id, token_key(api_token))
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(self.FIELDS, row))
+        del job["owner"]
+
+        # A worker killed after startup never starts or finishes the jobs it held; stop pollers waiting on them
+        if job["status"] in ("queued", "running") and job["updated_at"] < time.time() - self.stale_after:
+            with connect_sqlite(self.db_path) as conn:
+                conn.execute(
+                    "UPDATE report_jobs SET status = 'failed', error = 'Worker lost' "
+                    "WHERE job_id = ? AND status = ? AND updated_at = ?",
+                    (job_id, job["status"], job["updated_at"])
+                )
+            job.update(status="failed", error="Worker lost")
+        return job
+
+report_jobs = ReportJobStore(os.path.join(DATA_DIR, "report_jobs.db"), REPORT_JOB_STALE_AFTER)
+report_executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+
+class ReportCatalog:
+    """
+    SQLite index of the report files in the reports directory.
+
+    Every saved report is recorded with its space, creation time, size,
+    generator mode (``basic``, ``ai``, ``map_reduce`` or ``cached``) and
+    owner, so listing or filtering reports is an index lookup rather than a
+    directory scan. Reports written before the catalog existed are
+    backfilled from their file names by the first ``reindex`` and have no
+    owner; they stay visible to every logged-in user, as they were before.
+    Files that turn up without a row later (a report still being written
+    by another worker, or left behind by a failed one) are indexed under
+    ``ORPHAN_OWNER``, which matches no token, so nobody sees them.
+    """
+
+    ORPHAN_OWNER = "orphan"
+    FIELDS = ("filename", "space_id", "space_name", "created_at", "size", "mode")
+    FILENAME_PATTERN = re.compile(r"^clickup_report_(?P<space_id>.+)_(?P<timestamp>\d{8}_\d{6})\.md$")
+
+    def __init__(self, db_path: str, directory: str):
+        self.db_path = db_path
+        self.directory = directory
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with connect_sqlite(self.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "filename TEXT PRIMARY KEY, space_id TEXT NOT NULL, space_name TEXT, "
+                "created_at REAL NOT NULL, size INTEGER NOT NULL, mode TEXT NOT NULL, owner TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS reports_space ON reports (space_id, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS reports_created ON reports (created_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    def add(self, filename: str, space_id: str, space_name: Optional[str], mode: str,
+            api_token: Optional[str] = None) -> None:
+        """Record a report file that has just been written"""
+        path = os.path.join(self.directory, filename)
+        with connect_sqlite(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO reports (filename, space_id, space_name, created_at, size, mode, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (filename, space_id, space_name, time.time(), os.path.getsize(path), mode,
+                 token_key(api_token) if api_token else None)
+            )
+
+    def get(self, filename: str, api_token: str) -> Optional[Dict]:
+        """Return a report visible to the given token"""
+        with connect_sqlite(self.db_path) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM reports "
+                "WHERE filename = ? AND (owner = ? OR owner IS NULL)",
+                (filename, token_key(api_token))
+            ).fetchone()
+        return dict(zip(self.FIELDS, row)) if row else None
+
+    def search(self, api_token: str, space_id: Optional[str] = None, mode: Optional[str] = None,
+               since: Optional[float] = None, until: Optional[float] = None,
+               limit: int = 20, offset: int = 0) -> Tuple[List[Dict], int]:
+        """Return one page of the reports visible to a token, newest first, and the total match count"""
+        clauses = ["(owner = ? OR owner IS NULL)"]
+        params: List[Any] = [token_key(api_token)]
+        if space_id:
+            clauses.append("space_id = ?")
+            params.append(space_id)
+        if mode:
+            clauses.append("mode = ?")
+            params.append(mode)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = " AND ".join(clauses)
+
+        with connect_sqlite(self.db_path) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM reports WHERE {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM reports WHERE {where} "
+                "ORDER BY created_at DESC, filename DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+        return [dict(zip(self.FIELDS, row)) for row in rows], total
+
+    def reindex(self) -> int:
+        """Backfill report files missing from the index and drop entries whose file is gone"""
+        if not os.path.isdir(self.directory):
+            return 0
+        files = {}
+        for entry in os.scandir(self.directory):
+            match = self.FILENAME_PATTERN.match(entry.name)
+            if match and entry.is_file():
+                created_at = datetime.strptime(match.group("timestamp"), "%Y%m%d_%H%M%S").timestamp()
+                files[entry.name] = (match.group("space_id"), created_at, entry.stat().st_size)
+
+        conn = connect_sqlite(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            known = {row[0] for row in conn.execute("SELECT filename FROM reports")}
+            # Only the first backfill into an empty catalog covers pre-catalog reports, shared with everyone
+            legacy = not known and conn.execute(
+                "SELECT 1 FROM catalog_meta WHERE key = 'backfilled_at'"
+            ).fetchone() is None
+            conn.execute(
+                "INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('backfilled_at', ?)", (str(time.time()),)
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO reports (filename, space_id, space_name, created_at, size, mode, owner) "
+                "VALUES (?, ?, NULL, ?, ?, 'unknown', ?)",
+                [(filename, *files[filename], None if legacy else self.ORPHAN_OWNER)
+                 for filename in files.keys() - known]
+            )
+            conn.executemany("DELETE FROM reports WHERE filename = ?", [(filename,) for filename in known - files.keys()])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return len(files.keys() - known)
+
+class CompletionCache:
+    """
+    Content-addressed on-disk cache of LLM completions.
+
+    Each completion is stored as ``<sha256>.json`` under ``directory``, keyed
+    by a hash of the canonicalized prompt inputs. Reads refresh a file's
+    mtime, and writes evict the least recently used files once the cache
+    exceeds ``max_bytes``. Entries older than ``ttl`` seconds are ignored
+    when ``ttl`` is set.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl: int = 0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(inputs: Dict) -> str:
+        """Hash prompt inputs independently of dict ordering and whitespace"""
+        canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return ``{"content", "created_at"}`` for a fresh entry, or None"""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl and time.time() - entry["created_at"] > self.ttl:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, content: str) -> None:
+        """Store a completion, then evict least recently used entries over the size bound"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"content": content, "created_at": time.time()}, f)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+completion_cache = (
+    CompletionCache(os.path.join(DATA_DIR, "llm_cache"), LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL)
+    if LLM_CACHE_MAX_BYTES > 0 else None
+)
+
+# Rendered report HTML, keyed by the hash of its markdown source
+render_cache = (
+    CompletionCache(os.path.join(DATA_DIR, "rendered"), RENDER_CACHE_MAX_BYTES)
+    if RENDER_CACHE_MAX_BYTES > 0 else None
+)
+
+def render_markdown(report_content: str, digest: str) -> str:
+    """Render report markdown to HTML, reusing the cached rendering of identical content"""
+    cached = render_cache.get(digest) if render_cache else None
+    if cached:
+        return cached["content"]
+    html_content = markdown.markdown(report_content)
+    if render_cache:
+        render_cache.put(digest, html_content)
+    return html_content
+
+class PromptBuilder:
+    """
+    Compact, token-budgeted rendering of report prompts.
+
+    Assignees are written as pipe-separated rows instead of indented JSON,
+    list names are written once in a legend and referenced by short ids,
+    and when the rows do not fit the budget only the busiest assignees are
+    listed while the rest are folded into a single "others" row.
+    """
+
+    CHARS_PER_TOKEN = 4
+
+    REPORT_SECTIONS = """Please create a professional report that includes:
+1. Executive Summary
+2. Workload Distribution Analysis
+3. Task Status Overview
+4. Priority Distribution Analysis
+5. Team Member Performance Insights
+6. Recommendations for Workload Balancing
+7. Potential Bottlenecks or Areas of Concern
+
+Make the report data-driven but easy to understand. Include specific numbers and percentages where relevant.
+Format the report in Markdown."""
+
+    def __init__(self, token_budget: int):
+        self.token_budget = token_budget
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        """Rough token count (about four characters per token for English and JSON)"""
+        return len(text) // cls.CHARS_PER_TOKEN + 1
+
+    @staticmethod
+    def _counts(counts: Dict) -> str:
+        return ",".join(f"{name}:{count}" for name, count in sorted(counts.items(), key=lambda item: -item[1])) or "-"
+
+    def _row(self, summary: Dict, list_ids: Dict[str, str]) -> str:
+        return "|".join([
+            summary["name"],
+            summary["email"],
+            str(summary["task_count"]),
+            ",".join(list_ids[name] for name in summary["lists"]) or "-",
+            self._counts(summary["status_distribution"]),
+            self._counts(summary["priority_distribution"])
+        ])
+
+    def assignee_table(self, assignee_summaries: List[Dict], top_n: int) -> str:
+        """Render the ``top_n`` busiest assignees as rows and the rest as one "others" row"""
+        ranked = sorted(assignee_summaries, key=lambda summary: -summary["task_count"])
+        shown, others = ranked[:top_n], ranked[top_n:]
+
+        # Each list name is written once and referenced by id
+        list_ids: Dict[str, str] = {}
+        for summary in shown:
+            for list_name in summary["lists"]:
+                list_ids.setdefault(list_name, f"L{len(list_ids) + 1}")
+
+        lines = []
+        if list_ids:
+            lines.append("Lists: " + "; ".join(f"{list_id}={name}" for name, list_id in list_ids.items()))
+        lines.append("Assignees (name|email|tasks|lists|status counts|priority counts):")
+        for summary in shown:
+            lines.append(self._row(summary, list_ids))
+        if others:
+            status_counts: Dict[str, int] = defaultdict(int)
+            priority_counts: Dict[str, int] = defaultdict(int)
+            for summary in others:
+                for name, count in summary["status_distribution"].items():
+                    status_counts[name] += count
+                for name, count in summary["priority_distribution"].items():
+                    priority_counts[str(name)] += count
+            lines.append("|".join([
+                f"Others ({len(others)} assignees)",
+                "-",
+                str(sum(summary["task_count"] for summary in others)),
+                "-",
+                self._counts(status_counts),
+                self._counts(priority_counts)
+            ]))
+        return "\n".join(lines)
+
+    def fit_assignee_table(self, assignee_summaries: List[Dict], token_budget: int) -> str:
+        """Render as many assignees as fit in ``token_budget``, busiest first"""
+        low, high = 0, len(assignee_summaries)
+        best = self.assignee_table(assignee_summaries, 0)
+        # Binary search for the largest top_n that fits
+        while low <= high:
+            top_n = (low + high) // 2
+            table = self.assignee_table(assignee_summaries, top_n)
+            if self.estimate_tokens(table) <= token_budget:
+                best, low = table, top_n + 1
+            else:
+                high = top_n - 1
+        return best
+
+    def statistics(self, task_stats: Dict, space_name: str) -> str:
+        """Render the space-wide task statistics"""
+        return (
+            f"Workspace: {space_name}\n"
+            f"Tasks: total={task_stats['total_tasks']} completed={task_stats['completed_tasks']} "
+            f"open={task_stats['open_tasks']} lists={task_stats['lists_count']} folders={task_stats['folders_count']}\n"
+            f"Tasks by status: {self._counts(task_stats['tasks_by_status'])}\n"
+            f"Tasks by priority: {self._counts(task_stats['tasks_by_priority'])}"
+        )
+
+    def _head(self, summary: Dict, task_stats: Dict, space_name: str) -> str:
+        return (
+            "Please analyze this ClickUp workspace data and create a comprehensive report.\n\n"
+            f"{self.statistics(task_stats, space_name)}\n"
+            f"Total assignees: {summary['total_assignees']}\n\n"
+        )
+
+    def build(self, summary: Dict, task_stats: Dict, space_name: str) -> Tuple[str, int]:
+        """Return the report prompt and its estimated token count"""
+        head = self._head(summary, task_stats, space_name)
+        tail = "\n\n" + self.REPORT_SECTIONS
+        remaining = self.token_budget - self.estimate_tokens(head + tail)
+        prompt = head + self.fit_assignee_table(summary["assignee_summaries"], remaining) + tail
+        return prompt, self.estimate_tokens(prompt)
+
+    def fits(self, summary: Dict, task_stats: Dict, space_name: str) -> bool:
+        """Whether every assignee fits in a single prompt within the budget"""
+        summaries = summary["assignee_summaries"]
+        prompt = (
+            self._head(summary, task_stats, space_name)
+            + self.assignee_table(summaries, len(summaries))
+            + "\n\n" + self.REPORT_SECTIONS
+        )
+        return self.estimate_tokens(prompt) <= self.token_budget
+
+    def shard(self, assignee_summaries: List[Dict], chunk_tokens: int) -> List[List[Dict]]:
+        """Split assignees, busiest first, into chunks whose tables fit ``chunk_tokens``"""
+        ranked = sorted(assignee_summaries, key=lambda summary: -summary["task_count"])
+        header_size = self.estimate_tokens(self.assignee_table([], 0))
+        chunks: List[List[Dict]] = []
+        chunk: List[Dict] = []
+        chunk_lists: set = set()
+        chunk_size = header_size
+        for summary in ranked:
+            # Estimate with placeholder list ids; legend entries are paid once per chunk
+            row_size = self.estimate_tokens(self._row(summary, {name: "L00" for name in summary["lists"]}))
+            legend_size = {name: self.estimate_tokens(f"L00={name}; ") for name in summary["lists"]}
+            size = row_size + sum(cost for name, cost in legend_size.items() if name not in chunk_lists)
+            if chunk and chunk_size + size > chunk_tokens:
+                chunks.append(chunk)
+                chunk, chunk_lists = [], set()
+                size = row_size + sum(legend_size.values())
+                chunk_size = header_size
+            chunk.append(summary)
+            chunk_lists.update(summary["lists"])
+            chunk_size += size
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def map_prompt(self, chunk: List[Dict], space_name: str, index: int, total: int) -> str:
+        """Prompt summarizing one chunk of assignees"""
+        return (
+            f"You are reviewing group {index} of {total} of the team members in the ClickUp workspace {space_name}.\n\n"
+            f"{self.assignee_table(chunk, len(chunk))}\n\n"
+            "Summarize this group in concise Markdown bullet points (at most 200 words): "
+            "workload per person relative to the group, status and priority concerns, "
+            "and anyone who looks overloaded or idle. Use names and numbers."
+        )
+
+    @staticmethod
+    def _partial_sections(partials: List[Tuple[List[Dict], str]]) -> str:
+        return "\n\n".join(
+            f"Group {index} ({len(chunk)} assignees, {sum(member['task_count'] for member in chunk)} tasks):\n{analysis}"
+            for index, (chunk, analysis) in enumerate(partials, 1)
+        )
+
+    def reduce_prompt(self, summary: Dict, task_stats: Dict, space_name: str,
+                      partials: List[Tuple[List[Dict], str]]) -> str:
+        """Prompt merging the partial analyses of every chunk into the full report"""
+        return (
+            self._head(summary, task_stats, space_name)
+            + "The team was analyzed in groups. Partial analyses:\n\n"
+            + self._partial_sections(partials)
+            + "\n\n" + self.REPORT_SECTIONS
+        )
+
+    def fits_reduce(self, summary: Dict, task_stats: Dict, space_name: str,
+                    partials: List[Tuple[List[Dict], str]]) -> bool:
+        """Whether the reduce prompt over these partial analyses is within the budget"""
+        return self.estimate_tokens(self.reduce_prompt(summary, task_stats, space_name, partials)) <= self.token_budget
+
+    def combine_prompt(self, space_name: str, partials: List[Tuple[List[Dict], str]]) -> str:
+        """Prompt condensing several partial analyses into one, for a reduce prompt that is over budget"""
+        return (
+            f"You are condensing partial analyses of the team members in the ClickUp workspace {space_name}.\n\n"
+            f"{self._partial_sections(partials)}\n\n"
+            "Merge them into concise Markdown bullet points (at most 200 words): "
+            "keep names and numbers, and anyone who looks overloaded or idle."
+        )
+
+    def group_partials(self, space_name: str, partials: List[Tuple[List[Dict], str]]) -> List[List[Tuple[List[Dict], str]]]:
+        """Split partial analyses into runs of at least two whose combine prompts fit the budget"""
+        groups: List[List[Tuple[List[Dict], str]]] = []
+        group: List[Tuple[List[Dict], str]] = []
+        for partial in partials:
+            if len(group) >= 2 and self.estimate_tokens(self.combine_prompt(space_name, group + [partial])) > self.token_budget:
+                groups.append(group)
+                group = []
+            group.append(partial)
+        # A lone trailing analysis joins the previous run, so every round condenses
+        if len(group) == 1 and groups:
+            groups[-1].extend(group)
+        elif group:
+            groups.append(group)
+        return groups
 
 class ReportGenerator:
-    def __init__(self, api_key=None):
+    MODEL = "mixtral-8x7b-32768"  # Using Mixtral model
+    TEMPERATURE = 0.7
+    MAX_TOKENS = 2000
+
+    def __init__(self, api_key=None, mode: Optional[str] = None):
         """Initialize with optional API key for GPT integration"""
         self.api_key = api_key
+        self.mode = mode or LLM_REPORT_MODE
+        # How the last report was produced: basic, ai, map_reduce or cached
+        self.report_mode = "basic"
         if api_key:
-            self.api_url = "https://api.groq.com/openai/v1/chat/completions"
+            self.api_url = GROQ_API_URL
             self.headers = {
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
             }
         
+    def _start_report(self) -> None:
+        """Forget what the previous report on this generator recorded about itself"""
+        self.report_mode = "basic"
+
     def _prepare_data_summary(self, data: Dict) -> Dict:
         """Prepare a summary of the data for the LLM"""
         summary = {
@@ -228,100 +2918,275 @@ class ReportGenerator:
             "assignee_summaries": []
         }
 
-        for assignee_id, assignee_data in data.items():
-            # Calculate task status distribution
-            status_count = {}
-            for task in assignee_data["tasks"]:
-                status = task["status"]
-                status_count[status] = status_count.get(status, 0) + 1
+        # Load every assignee's tasks once, then count both distributions vectorized
+        columns = TaskColumns()
+        for assignee_id, assignee_data in data.items():
+            for task in assignee_data["tasks"]:
+                columns.append(task.status, task.priority, task.list_name, assignee_ids=(assignee_id,))
+
+        status_counts: Dict[Any, Dict[str, int]] = defaultdict(dict)
+        for (assignee_id, status), count in columns.group_counts(("assignee", "status")).items():
+            status_counts[assignee_id][status] = count
+        priority_counts: Dict[Any, Dict[str, int]] = defaultdict(dict)
+        for (assignee_id, priority), count in columns.group_counts(("assignee", "priority")).items():
+            priority_counts[assignee_id][priority] = count
+
+        for assignee_id, assignee_data in data.items():
+            status_count = status_counts.get(assignee_id, {})
+            priority_count = priority_counts.get(assignee_id, {})
+
+            summary["assignee_summaries"].append({
+                "name": assignee_data["name"],
+                "email": assignee_data["email"],
+                "task_count": assignee_data["task_count"],
+                "lists": assignee_data["lists"],
+                "status_distribution": status_count,
+                "priority_distribution": priority_count
+            })
+
+        return summary
+
+    def generate_report(self, assignee_data: Dict, task_stats: Dict, space_name: str,
+                        on_stage: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Generate a report combining assignee data and task statistics
+
+        ``on_stage`` is called with ``"aggregate"`` and, for AI reports,
+        ``"llm"`` as generation progresses.
+        """
+        on_stage = on_stage or (lambda stage: None)
+        on_stage("aggregate")
+        self._start_report()
+        if not self.api_key:
+            # If no API key, generate a basic report
+            return self._generate_basic_report(assignee_data, task_stats, space_name)
+        
+        try:
+            # Identical inputs return the stored completion without calling GROQ
+            started = time.perf_counter()
+            summary = self._prepare_data_summary(assignee_data)
+            observe_duration("report_stage_seconds", started, {"stage": "aggregate"})
+            cache_key = self._cache_key(summary, task_stats, space_name)
+            cached = self._cache_lookup(cache_key)
+            if cached:
+                self.report_mode = "cached"
+                return cached["content"] + self._cache_note(cached)
+
+            # Generate report using GROQ
+            on_stage("llm")
+            started = time.perf_counter()
+            payload = self._build_payload(summary, task_stats, space_name)
+            report = self._complete(payload)
+            observe_duration("report_stage_seconds", started, {"stage": "llm"})
+            if completion_cache:
+                completion_cache.put(cache_key, report)
+            return report
+
+        except Exception as e:
+            print(f"Error generating report with LLM: {str(e)}")
+            # Fall back to basic report
+            self.report_mode = "basic"
+            return self._generate_basic_report(assignee_data, task_stats, space_name)
+
+    def stream_report(self, assignee_data: Dict, task_stats: Dict, space_name: str) -> Iterator[Any]:
+        """
+        Generate a report as a stream of text chunks
+
+        AI reports request ``stream: true`` and yield each content delta as
+        it arrives; without an API key the basic report is yielded whole.
+        In map-reduce mode no text exists until the reduce call starts, so a
+        ``{"stage": "map" or "combine", "done": ..., "total": ...}`` dict is
+        yielded as each intermediate call completes.
+        """
+        self._start_report()
+        if not self.api_key:
+            yield self._generate_basic_report(assignee_data, task_stats, space_name)
+            return
+
+        streamed = False
+        try:
+            started = time.perf_counter()
+            summary = self._prepare_data_summary(assignee_data)
+            observe_duration("report_stage_seconds", started, {"stage": "aggregate"})
+            cache_key = self._cache_key(summary, task_stats, space_name)
+            cached = self._cache_lookup(cache_key)
+            if cached:
+                self.report_mode = "cached"
+                yield cached["content"] + self._cache_note(cached)
+                return
+
+            payload = yield from self._payload_steps(summary, task_stats, space_name)
+            payload["stream"] = True
+            chunks = []
+
+            started = time.perf_counter()
+            status, size = "error", 0
+            try:
+                with requests.post(
+                    self.api_url,
+                    headers=self.headers,
+                    json=payload,
+                    stream=True,
+                    timeout=LLM_TIMEOUT
+                ) as response:
+                    status = str(response.status_code)
+                    response.raise_for_status()
+                    for line in response.iter_lines(decode_unicode=True):
+                        # Server-sent events: "data: {...}" lines, ending with "data: [DONE]"
+                        if not line or not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                        if delta:
+                            if not streamed:
+                                observe_duration("llm_first_token_seconds", started)
+                            streamed = True
+                            size += len(delta.encode())
+                            chunks.append(delta)
+                            yield delta
+            finally:
+                observe_llm_call("stream", status, time.perf_counter() - started, size)
+
+            # Only complete completions are cached
+            if completion_cache and chunks:
+                completion_cache.put(cache_key, "".join(chunks))
+
+        except Exception as e:
+            print(f"Error streaming report with LLM: {str(e)}")
+            if streamed:
+                yield "\n\n*The AI analysis was interrupted.*\n"
+            else:
+                # Fall back to basic report
+                self.report_mode = "basic"
+                yield self._generate_basic_report(assignee_data, task_stats, space_name)
+
+    def _cache_key(self, summary: Dict, task_stats: Dict, space_name: str) -> str:
+        """Content address of an AI report: everything that shapes the prompt and sampling"""
+        return CompletionCache.key({
+            "summary": summary,
+            "task_stats": task_stats,
+            "space_name": space_name,
+            "model": self.MODEL,
+            "temperature": self.TEMPERATURE,
+            "max_tokens": self.MAX_TOKENS,
+            "prompt_budget": LLM_PROMPT_TOKEN_BUDGET,
+            "mode": self.mode
+        })
 
-            # Calculate priority distribution
-            priority_count = {}
-            for task in assignee_data["tasks"]:
-                priority = task.get("priority", "No priority")
-                priority_count[priority] = priority_count.get(priority, 0) + 1
+    @staticmethod
+    def _cache_lookup(cache_key: str) -> Optional[Dict]:
+        """Look up a completion, counting hits and misses"""
+        cached = completion_cache.get(cache_key) if completion_cache else None
+        if metrics and completion_cache:
+            metrics.inc("llm_cache_lookups_total", {"result": "hit" if cached else "miss"})
+        return cached
 
-            summary["assignee_summaries"].append({
-                "name": assignee_data["name"],
-                "email": assignee_data["email"],
-                "task_count": assignee_data["task_count"],
-                "lists": assignee_data["lists"],
-                "status_distribution": status_count,
-                "priority_distribution": priority_count
-            })
+    @staticmethod
+    def _cache_note(entry: Dict) -> str:
+        """Footer marking a report that was served from the completion cache"""
+        generated = datetime.fromtimestamp(entry["created_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        return f"\n\n---\n*Served from the report cache (AI analysis generated on {generated}).*\n"
 
-        return summary
+    def _build_payload(self, summary: Dict, task_stats: Dict, space_name: str) -> Dict:
+        """Build the chat-completions request for an AI report from a data summary"""
+        steps = self._payload_steps(summary, task_stats, space_name)
+        while True:
+            try:
+                next(steps)
+            except StopIteration as finished:
+                return finished.value
 
-    def generate_report(self, assignee_data: Dict, task_stats: Dict, space_name: str) -> str:
-        """Generate a report combining assignee data and task statistics"""
-        if not self.api_key:
-            # If no API key, generate a basic report
-            return self._generate_basic_report(assignee_data, task_stats, space_name)
-        
-        # Prepare data summary for LLM
-        summary = self._prepare_data_summary(assignee_data)
-        
-        # Create prompt for LLM
-        prompt = f"""
-        Please analyze this ClickUp workspace data and create a comprehensive report. 
+    def _payload_steps(self, summary: Dict, task_stats: Dict, space_name: str) -> Iterator[Dict]:
+        """
+        Build the chat-completions request for an AI report, yielding map progress
 
-        Workspace: {space_name}
-        
-        Task Statistics:
-        Total Tasks: {task_stats['total_tasks']}
-        Completed Tasks: {task_stats['completed_tasks']}
-        Open Tasks: {task_stats['open_tasks']}
-        Number of Lists: {task_stats['lists_count']}
-        Number of Folders: {task_stats['folders_count']}
-        
-        Tasks by Status: {json.dumps(task_stats['tasks_by_status'])}
-        Tasks by Priority: {json.dumps(task_stats['tasks_by_priority'])}
-        
-        Assignee Information:
-        Total Assignees: {summary['total_assignees']}
-        
-        Detailed Assignee Information:
-        {json.dumps(summary['assignee_summaries'], indent=2)}
+        In map-reduce mode this runs the map phase first: the assignees are
+        sharded into chunks that are summarized concurrently (at most
+        LLM_MAP_PARALLELISM requests at once), and the returned request is the
+        reduce call that merges those partial analyses into the full report.
+        While the partial analyses do not fit one reduce prompt within
+        LLM_PROMPT_TOKEN_BUDGET, runs of them are condensed into one each.
+        A progress dict is yielded as each map or combine call completes.
+        """
+        builder = PromptBuilder(LLM_PROMPT_TOKEN_BUDGET)
+        map_reduce = self.mode == "map_reduce" or (
+            self.mode == "auto" and not builder.fits(summary, task_stats, space_name)
+        )
+        self.report_mode = "map_reduce" if map_reduce else "ai"
+
+        if map_reduce:
+            chunks = builder.shard(summary["assignee_summaries"], LLM_MAP_CHUNK_TOKENS)
+            map_prompts = [builder.map_prompt(chunk, space_name, index, len(chunks)) for index, chunk in enumerate(chunks, 1)]
+            record_prompt_tokens("map", sum(builder.estimate_tokens(prompt) for prompt in map_prompts))
+            analyses = yield from self._complete_all("map", map_prompts)
+            partials = list(zip(chunks, analyses))
+
+            # Map outputs are short, but their number grows with the team: summarize summaries until they fit
+            while len(partials) > 1 and not builder.fits_reduce(summary, task_stats, space_name, partials):
+                groups = builder.group_partials(space_name, partials)
+                combine_prompts = [builder.combine_prompt(space_name, group) for group in groups]
+                record_prompt_tokens("combine", sum(builder.estimate_tokens(prompt) for prompt in combine_prompts))
+                condensed = yield from self._complete_all("combine", combine_prompts)
+                partials = [
+                    ([member for chunk, _ in group for member in chunk], analysis)
+                    for group, analysis in zip(groups, condensed)
+                ]
 
-        Please create a professional report that includes:
-        1. Executive Summary
-        2. Workload Distribution Analysis
-        3. Task Status Overview
-        4. Priority Distribution Analysis
-        5. Team Member Performance Insights
-        6. Recommendations for Workload Balancing
-        7. Potential Bottlenecks or Areas of Concern
+            prompt = builder.reduce_prompt(summary, task_stats, space_name, partials)
+            record_prompt_tokens("reduce", builder.estimate_tokens(prompt))
+        else:
+            # Create a compact prompt for LLM within the token budget
+            prompt, prompt_tokens = builder.build(summary, task_stats, space_name)
+            record_prompt_tokens("single", prompt_tokens)
 
-        Make the report data-driven but easy to understand. Include specific numbers and percentages where relevant.
-        Format the report in Markdown.
+        return self._payload(prompt, self.MAX_TOKENS)
+
+    def _complete_all(self, stage: str, prompts: List[str]) -> Iterator[Dict]:
         """
+        Complete short intermediate prompts concurrently, yielding progress
 
-        try:
-            # Generate report using GROQ
-            payload = {
-                "model": "mixtral-8x7b-32768",  # Using Mixtral model
-                "messages": [
-                    {"role": "system", "content": "You are a professional project management analyst creating a report based on ClickUp workspace data."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 2000
-            }
+        At most LLM_MAP_PARALLELISM requests are in flight. Returns the
+        completions in the order of ``prompts``.
+        """
+        results: List[Optional[str]] = [None] * len(prompts)
+        with ThreadPoolExecutor(max_workers=max(1, LLM_MAP_PARALLELISM)) as executor:
+            futures = {executor.submit(self._complete, self._payload(prompt, LLM_MAP_MAX_TOKENS)): index
+                       for index, prompt in enumerate(prompts)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                yield {"stage": stage, "done": done, "total": len(prompts)}
+        return results
+
+    def _payload(self, prompt: str, max_tokens: int) -> Dict:
+        """Wrap a prompt in a chat-completions request"""
+        return {
+            "model": self.MODEL,
+            "messages": [
+                {"role": "system", "content": "You are a professional project management analyst creating a report based on ClickUp workspace data."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": self.TEMPERATURE,
+            "max_tokens": max_tokens
+        }
 
+    def _complete(self, payload: Dict) -> str:
+        """Send a chat-completions request and return the generated text"""
+        started = time.perf_counter()
+        try:
             response = requests.post(
                 self.api_url,
                 headers=self.headers,
-                json=payload
+                json=payload,
+                timeout=LLM_TIMEOUT
             )
-
-            response.raise_for_status()
-            report = response.json()["choices"][0]["message"]["content"]
-            return report
-
-        except Exception as e:
-            print(f"Error generating report with LLM: {str(e)}")
-            # Fall back to basic report
-            return self._generate_basic_report(assignee_data, task_stats, space_name)
+        except requests.RequestException:
+            observe_llm_call("complete", "error", time.perf_counter() - started)
+            raise
+        observe_llm_call("complete", str(response.status_code), time.perf_counter() - started, len(response.content))
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
 
     def _generate_basic_report(self, assignee_data: Dict, task_stats: Dict, space_name: str) -> str:
         """Generate a basic report without using LLM"""
@@ -696,8 +3561,53 @@ This report provides an analysis of your ClickUp workspace "{space_name}".
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 app.config['UPLOAD_FOLDER'] = 'reports'
+
+report_catalog = ReportCatalog(os.path.join(DATA_DIR, "reports.db"), app.config['UPLOAD_FOLDER'])
+report_catalog.reindex()
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+def page_version() -> Tuple[str, float]:
+    """Hash and newest modification time of the code and templates that render report pages"""
+    template_dir = os.path.join(app.root_path, app.template_folder)
+    paths = [os.path.abspath(__file__)] + [os.path.join(template_dir, name) for name in sorted(os.listdir(template_dir))]
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16], max(os.path.getmtime(path) for path in paths)
+
+# A deploy that changes the page around a report must not be answered with a 304
+PAGE_VERSION, PAGE_MTIME = page_version()
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    # Streamed responses are timed up to the first byte; their crawl shows up in space_crawl_seconds
+    if metrics and 'request_started' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.inc('http_requests_total', {'route': route, 'method': request.method, 'status': str(response.status_code)})
+        observe_duration('http_request_duration_seconds', g.request_started, {'route': route, 'method': request.method})
+    return response
+
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    g.template_started = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def record_template_metrics(sender, template, context, **extra):
+    if 'template_started' in g:
+        observe_duration('template_render_seconds', g.pop('template_started'), {'template': template.name or 'inline'})
+
+@app.before_request
+def drop_legacy_session_report():
+    # Reports used to ride along in the session cookie; they are served from disk now
+    if 'report_content' in session:
+        session.pop('report_content', None)
+        session.pop('report_filename', None)
+
 # Routes
 @app.route('/')
 def index():
@@ -728,7 +3638,11 @@ def login():
 
 @app.route('/logout')
 def logout():
-    session.pop('api_token', None)
+    api_token = session.pop('api_token', None)
+    if api_token:
+        release_session(api_token)
+        hierarchy_cache.invalidate(api_token)
+        rollup_cache.invalidate(api_token)
     flash('Logged out successfully', 'success')
     return redirect(url_for('index'))
 
@@ -770,74 +3684,241 @@ def space_dashboard(space_id):
         return redirect(url_for('index'))
     
     days_back = request.args.get('days_back', default=30, type=int)
+    start = request.args.get('start', '')
+    end = request.args.get('end', '')
+    try:
+        first_day, last_day = created_days(days_back, start, end)
+    except ValueError:
+        flash('Invalid date range', 'warning')
+        return redirect(url_for('space_dashboard', space_id=space_id))
     
     try:
-        manager = ClickUpManager(api_token)
-        space_details = manager.get_space_details(space_id)
-        
-        # Get task statistics
-        task_counter = ClickUpTaskCounter(api_token)
-        task_stats = task_counter.count_tasks_in_space(space_id, days_back=days_back)
+        # Only the page shell is rendered here; each section loads from its own API
+        space_details = ClickUpManager(api_token).get_space_details(space_id)
         
-        # Get assignee data
-        assignee_tracker = SpaceAssigneeTracker(api_token)
-        assignee_data = assignee_tracker.get_space_assignees(space_id)
+        # Start the crawl now, so the section requests share it instead of waiting for the first of them
+        if cached_rollup(api_token, space_id) is None:
+            prefetch_executor.submit(prefetch_snapshot, api_token, space_id)
         
         return render_template(
             'space_dashboard.html', 
             space=space_details, 
-            task_stats=task_stats,
-            assignee_data=assignee_data,
-            days_back=days_back
+            days_back=days_back,
+            start=start,
+            end=end
         )
     except Exception as e:
         flash(f'Error retrieving space data: {str(e)}', 'danger')
         return redirect(url_for('workspaces'))
 
-@app.route('/generate_report/<space_id>', methods=['POST'])
-def generate_report(space_id):
-    api_token = session.get('api_token')
-    if not api_token:
-        flash('Please log in first', 'warning')
-        return redirect(url_for('index'))
-    
-    groq_api_key = request.form.get('groq_api_key', '')
-    
+def run_report_job(job_id: str, api_token: str, space_id: str, groq_api_key: Optional[str]) -> None:
+    """Generate a report in the background, recording each stage in the job table"""
     try:
-        # Get space details first
-        manager = ClickUpManager(api_token)
-        space_details = manager.get_space_details(space_id)
-        space_name = space_details.get('name', 'Unknown Space')
-        
-        # Get task statistics
-        task_counter = ClickUpTaskCounter(api_token)
-        task_stats = task_counter.count_tasks_in_space(space_id)
-        
-        # Get assignee data
-        assignee_tracker = SpaceAssigneeTracker(api_token)
-        assignee_data = assignee_tracker.get_space_assignees(space_id)
+        # Crawl the space once for its details, task statistics and assignee data
+        report_jobs.update(job_id, status='running', stage='crawl')
+        snapshot = take_snapshot(api_token, space_id)
+        space_name = snapshot["space"].get('name', 'Unknown Space')
         
         # Generate report
-        report_generator = ReportGenerator(groq_api_key if groq_api_key else None)
-        report_content = report_generator.generate_report(assignee_data, task_stats, space_name)
+        report_generator = ReportGenerator(groq_api_key)
+        report_content = report_generator.generate_report(
+            snapshot["assignee_data"],
+            snapshot["task_stats"],
+            space_name,
+            on_stage=lambda stage: report_jobs.update(job_id, stage=stage)
+        )
         
         # Save report to file
+        report_jobs.update(job_id, stage='write')
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"clickup_report_{space_id}_{timestamp}.md"
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         
         with open(filepath, 'w') as f:
             f.write(report_content)
+        report_catalog.add(filename, space_id, space_name, report_generator.report_mode, api_token)
         
-        # Store report in session for display
-        session['report_content'] = report_content
-        session['report_filename'] = filename
-        
-        flash('Report generated successfully', 'success')
-        return redirect(url_for('view_report'))
+        report_jobs.update(job_id, status='done', stage='done', filename=filename)
     except Exception as e:
-        flash(f'Error generating report: {str(e)}', 'danger')
-        return redirect(url_for('space_dashboard', space_id=space_id))
+        print(f"Error generating report: {e}")
+        report_jobs.update(job_id, status='failed', error=str(e))
+
+@app.route('/generate_report/<space_id>', methods=['POST'])
+def generate_report(space_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify({'error': 'Unauthorized'}), 401
+        flash('Please log in first', 'warning')
+        return redirect(url_for('index'))
+    
+    groq_api_key = request.form.get('groq_api_key', '')
+    
+    # Queue the report; the crawl and LLM call run off the request thread
+    job_id = report_jobs.create(api_token, space_id)
+    report_executor.submit(run_report_job, job_id, api_token, space_id, groq_api_key or None)
+    
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({
+            'job_id': job_id,
+            'status_url': url_for('api_report_status', job_id=job_id)
+        }), 202
+    
+    flash('Report queued', 'info')
+    return redirect(url_for('report_job', job_id=job_id))
+
+def sse_event(data: Dict, event: Optional[str] = None) -> str:
+    """Format one server-sent event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+@app.route('/stream_report/<space_id>')
+def stream_report_view(space_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        flash('Please log in first', 'warning')
+        return redirect(url_for('index'))
+    
+    # The page shell renders at once; its script POSTs to the SSE route
+    return render_template(
+        'view_report.html',
+        report_content='',
+        filename=None,
+        stream_url=url_for('api_stream_report', space_id=space_id)
+    )
+
+def partial_path(filepath: str) -> str:
+    """Where a report is written until it is complete; the suffix keeps it out of the catalog"""
+    return filepath + ".part"
+
+@app.route('/api/stream_report/<space_id>', methods=['POST'])
+def api_stream_report(space_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    groq_api_key = request.form.get('groq_api_key', '') or None
+    
+    def events():
+        filepath = None
+        yield sse_event({'stage': 'crawl'}, 'stage')
+        try:
+            snapshot = take_snapshot(api_token, space_id)
+            space_name = snapshot["space"].get('name', 'Unknown Space')
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"clickup_report_{space_id}_{timestamp}.md"
+            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            
+            yield sse_event({'stage': 'llm'}, 'stage')
+            report_generator = ReportGenerator(groq_api_key)
+            # Each chunk goes to the browser and a temporary file as it arrives; the report
+            # only appears under its real name, with its owner, once it is complete
+            with open(partial_path(filepath), 'w') as f:
+                for chunk in report_generator.stream_report(snapshot["assignee_data"], snapshot["task_stats"], space_name):
+                    if isinstance(chunk, dict):
+                        yield sse_event(chunk, 'progress')
+                        continue
+                    f.write(chunk)
+                    f.flush()
+                    yield sse_event({'text': chunk})
+            os.replace(partial_path(filepath), filepath)
+            report_catalog.add(filename, space_id, space_name, report_generator.report_mode, api_token)
+            
+            yield sse_event({
+                'filename': filename,
+                'report_url': url_for('view_report', filename=filename),
+                'download_url': url_for('download_report', filename=filename)
+            }, 'done')
+        except Exception as e:
+            print(f"Error streaming report: {e}")
+            yield sse_event({'error': str(e)}, 'error')
+        finally:
+            # Also runs on GeneratorExit, when the client goes away mid-stream
+            if filepath and os.path.exists(partial_path(filepath)):
+                os.remove(partial_path(filepath))
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/export/<space_id>')
+def export_tasks(space_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Unknown format: {export_format}'}), 400
+    
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    fields = fields or list(DEFAULT_EXPORT_FIELDS)
+    unknown = [field for field in fields if field not in EXPORT_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    
+    # Same window parameters as the dashboard, but every task by default
+    try:
+        first_day, last_day = created_days(
+            request.args.get('days_back', type=int), request.args.get('start'), request.args.get('end')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    created_after = first_day * DAY_MS - 1 if first_day is not None else None
+    created_before = (last_day + 1) * DAY_MS if last_day is not None else None
+    
+    exporter = SpaceTaskExporter(api_token)
+    try:
+        # The hierarchy is fetched before streaming starts, so its errors still get a status code
+        lists = exporter.get_space_lists(space_id)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    encode, encode_error, mimetype = EXPORT_FORMATS[export_format]
+    batches = encode(exporter.iter_rows(lists, fields, created_after, created_before), fields)
+    try:
+        # The first batch is read before the response starts, so a failing first page still gets a status code
+        first_batch = next(batches, '')
+    except Exception as e:
+        print(f"Error exporting tasks: {e}")
+        return jsonify({'error': str(e)}), 500
+    
+    def chunks():
+        yield first_batch
+        try:
+            yield from batches
+        except Exception as e:
+            # Headers are gone by now; readers get the error as a last line or row instead of a silent cut
+            print(f"Error exporting tasks: {e}")
+            yield encode_error(str(e))
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return Response(
+        stream_with_context(chunks()),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename=clickup_tasks_{space_id}_{timestamp}.{export_format}',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@app.route('/report_job/<job_id>')
+def report_job(job_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        flash('Please log in first', 'warning')
+        return redirect(url_for('index'))
+    
+    job = report_jobs.get(job_id, api_token)
+    if not job:
+        flash('Report job not found', 'warning')
+        return redirect(url_for('workspaces'))
+    
+    return render_template('report_job.html', job=job)
 
 # @app.route('/view_report')
 # def view_report():
@@ -858,28 +3939,144 @@ def generate_report(space_id):
 import markdown
 
 @app.route('/view_report')
-def view_report():
+@app.route('/view_report/<filename>')
+def view_report(filename=None):
     api_token = session.get('api_token')
     if not api_token:
         flash('Please log in first', 'warning')
         return redirect(url_for('index'))
     
-    report_content = session.get('report_content')
-    if not report_content:
+    if not filename:
+        # Without an id, show the caller's latest report
+        latest, _ = report_catalog.search(api_token, limit=1)
+        if not latest:
+            flash('No report found', 'warning')
+            return redirect(url_for('workspaces'))
+        return redirect(url_for('view_report', filename=latest[0]['filename']))
+    
+    # Reports are read back from disk by their catalog id
+    filename = os.path.basename(filename)
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    if not report_catalog.get(filename, api_token) or not os.path.isfile(filepath):
         flash('No report found', 'warning')
         return redirect(url_for('workspaces'))
     
+    with open(filepath, 'rb') as f:
+        report_bytes = f.read()
+    digest = hashlib.sha256(report_bytes).hexdigest()
+    
+    # Browsers revalidate with If-None-Match/If-Modified-Since and get a 304 when unchanged.
+    # The tag is weak: the page also depends on the templates and the session, not just the report
+    response = Response(mimetype='text/html')
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    if not session.get('_flashes'):
+        # A page showing flashed messages is never revalidated, or a later 304 would show them again
+        response.set_etag(f"{digest}-{PAGE_VERSION}", weak=True)
+        response.last_modified = datetime.fromtimestamp(int(max(os.path.getmtime(filepath), PAGE_MTIME)), timezone.utc)
+        response.make_conditional(request)
+        if response.status_code == 304:
+            return response
+    
     # Convert markdown to HTML
-    html_content = markdown.markdown(report_content)
+    html_content = render_markdown(report_bytes.decode(), digest)
     
-    filename = session.get('report_filename', 'report.md')
-    return render_template('view_report.html', report_content=html_content, filename=filename)
+    response.set_data(render_template('view_report.html', report_content=html_content, filename=filename))
+    return response
 
 @app.route('/download_report/<filename>')
 def download_report(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    api_token = session.get('api_token')
+    if not api_token:
+        flash('Please log in first', 'warning')
+        return redirect(url_for('index'))
+    
+    if not report_catalog.get(filename, api_token):
+        flash('No report found', 'warning')
+        return redirect(url_for('workspaces'))
+    
+    # The file is streamed from disk in blocks, with Range and conditional request support;
+    # reports are written relative to the working directory, not the app root
+    return send_from_directory(os.path.abspath(app.config['UPLOAD_FOLDER']), filename, as_attachment=True, conditional=True)
+
+def report_catalog_page(api_token: str, space_id: Optional[str] = None) -> Dict:
+    """Search the report catalog with the filters and page given in the query string"""
+    page = max(request.args.get('page', default=1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', default=20, type=int), 1), 100)
+    
+    # since/until take ISO dates; days_back is a shorthand for "since N days ago"
+    since = until = None
+    days_back = request.args.get('days_back', type=int)
+    if days_back:
+        since = (datetime.now() - timedelta(days=days_back)).timestamp()
+    if request.args.get('since'):
+        since = datetime.fromisoformat(request.args['since']).timestamp()
+    if request.args.get('until'):
+        until = datetime.fromisoformat(request.args['until']).timestamp()
+    
+    reports, total = report_catalog.search(
+        api_token,
+        space_id=space_id or request.args.get('space_id'),
+        mode=request.args.get('mode'),
+        since=since,
+        until=until,
+        limit=per_page,
+        offset=(page - 1) * per_page
+    )
+    for report in reports:
+        report['created'] = datetime.fromtimestamp(report['created_at']).strftime("%Y-%m-%d %H:%M:%S")
+        report['view_url'] = url_for('view_report', filename=report['filename'])
+        report['download_url'] = url_for('download_report', filename=report['filename'])
+    
+    return {
+        'reports': reports,
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'pages': (total + per_page - 1) // per_page
+    }
+
+@app.route('/reports/<space_id>')
+def report_history(space_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        flash('Please log in first', 'warning')
+        return redirect(url_for('index'))
+    
+    try:
+        catalog_page = report_catalog_page(api_token, space_id)
+    except ValueError:
+        flash('Invalid date filter', 'warning')
+        return redirect(url_for('report_history', space_id=space_id))
+    
+    return render_template('report_history.html', space_id=space_id, **catalog_page)
+
+@app.route('/api/reports')
+def api_reports():
+    api_token = session.get('api_token')
+    if not api_token:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        return jsonify(report_catalog_page(api_token))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
 # API routes for AJAX calls
+@app.route('/api/report_status/<job_id>')
+def api_report_status(job_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    job = report_jobs.get(job_id, api_token)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    if job['status'] == 'done':
+        job['report_url'] = url_for('view_report', filename=job['filename'])
+    return jsonify(job)
+
 @app.route('/api/task_stats/<space_id>')
 def api_task_stats(space_id):
     api_token = session.get('api_token')
@@ -887,14 +4084,240 @@ def api_task_stats(space_id):
         return jsonify({'error': 'Unauthorized'}), 401
     
     days_back = request.args.get('days_back', default=30, type=int)
+    try:
+        first_day, last_day = created_days(days_back, request.args.get('start'), request.args.get('end'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     try:
         # Get task statistics
-        task_counter = ClickUpTaskCounter(api_token)
-        task_stats = task_counter.count_tasks_in_space(space_id, days_back=days_back)
-        return jsonify(task_stats)
+        snapshot = live_snapshot(api_token, space_id, first_day, last_day)
+        return jsonify(snapshot["task_stats"])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/assignees/<space_id>')
+def api_assignees(space_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Task records are only sent on request, as they dwarf the rest of the payload
+    include_tasks = request.args.get('tasks') == '1'
+    
+    try:
+        # The webhook counters hold no task records, so a request for them is served from a crawl
+        snapshot = live_snapshot(api_token, space_id, with_tasks=include_tasks)
+        assignee_data = snapshot["assignee_data"]
+        if include_tasks:
+            assignee_data = assignee_data_to_json(assignee_data)
+        else:
+            assignee_data = {assignee_id: {key: value for key, value in data.items() if key != 'tasks'}
+                             for assignee_id, data in assignee_data.items()}
+        
+        # A list keeps the server's order, which a JSON object keyed by numeric ids would not
+        return jsonify({
+            'assignees': [dict(data, id=assignee_id) for assignee_id, data in assignee_data.items()]
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/task_trend/<space_id>')
+def api_task_trend(space_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    dimension = request.args.get('dimension', 'status')
+    if dimension not in DailyRollup.DIMENSIONS:
+        return jsonify({'error': f'Unknown dimension: {dimension}'}), 400
+    
+    days_back = request.args.get('days_back', default=30, type=int)
+    try:
+        first_day, last_day = created_days(days_back, request.args.get('start'), request.args.get('end'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        rollup = live_snapshot(api_token, space_id)["rollup"]
+        if rollup is None:
+            return jsonify({'error': 'Space could not be crawled'}), 502
+        
+        # Open-ended windows run up to today, so quiet recent days show as zeros
+        today = int(time.time() * 1000) // DAY_MS
+        trend = rollup.trend(dimension, first_day, today if last_day is None else last_day)
+        if dimension == 'status':
+            trend['completed'] = [
+                sum(counts) for counts in zip(*(
+                    series for status, series in trend['series'].items() if status.lower() in COMPLETED_STATUSES
+                ))
+            ] or [0] * len(trend['days'])
+        if dimension != 'assignee':
+            trend['created'] = [sum(counts) for counts in zip(*trend['series'].values())] or [0] * len(trend['days'])
+        return jsonify(trend)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/team/<team_id>/dashboard')
+def team_dashboard(team_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        flash('Please log in first', 'warning')
+        return redirect(url_for('index'))
+    
+    days_back = request.args.get('days_back', default=30, type=int)
+    
+    try:
+        # Only the space list is fetched here; the crawls stream in from the SSE route
+        spaces = ClickUpManager(api_token).get_spaces_in_team(team_id)
+    except Exception as e:
+        flash(f'Error retrieving spaces: {str(e)}', 'danger')
+        return redirect(url_for('workspaces'))
+    
+    return render_template(
+        'team_dashboard.html',
+        team_id=team_id,
+        spaces=spaces,
+        days_back=days_back,
+        stream_url=url_for('api_team_dashboard_stream', team_id=team_id, days_back=days_back)
+    )
+
+@app.route('/api/team/<team_id>/dashboard')
+def api_team_dashboard(team_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    days_back = request.args.get('days_back', default=30, type=int)
+    
+    try:
+        spaces = ClickUpManager(api_token).get_spaces_in_team(team_id)
+        rollup = TeamRollup()
+        summaries, errors = {}, []
+        for space, snapshot, error in iter_team_snapshots(api_token, spaces, days_back):
+            if error:
+                errors.append({'space_id': space['id'], 'error': error})
+            else:
+                summaries[space['id']] = rollup.add(snapshot)
+        
+        return jsonify({
+            'team_id': team_id,
+            # Spaces are listed in team order, whichever finished first
+            'spaces': [summaries[space['id']] for space in spaces if space['id'] in summaries],
+            'errors': errors,
+            **rollup.to_json()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/team/<team_id>/dashboard/stream')
+def api_team_dashboard_stream(team_id):
+    api_token = session.get('api_token')
+    if not api_token:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    days_back = request.args.get('days_back', default=30, type=int)
+    
+    def events():
+        try:
+            spaces = ClickUpManager(api_token).get_spaces_in_team(team_id)
+            rollup = TeamRollup()
+            # Each space is sent as soon as its crawl finishes, then the full rollup
+            for space, snapshot, error in iter_team_snapshots(api_token, spaces, days_back):
+                if error:
+                    yield sse_event({'space_id': space['id'], 'error': error}, 'space_error')
+                else:
+                    yield sse_event(rollup.add(snapshot), 'space')
+            yield sse_event(rollup.to_json(), 'done')
+        except Exception as e:
+            print(f"Error streaming team dashboard: {e}")
+            yield sse_event({'error': str(e)}, 'error')
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if not metrics:
+        return Response('Metrics are disabled\n', status=404, mimetype='text/plain')
+    
+    # Prometheus text format, summed across every worker that has reported
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/webhooks/clickup', methods=['POST'])
+def clickup_webhook():
+    if not space_counters:
+        return jsonify({'error': 'Webhooks are not configured'}), 503
+    
+    body = request.get_data()
+    if not verify_webhook_signature(body, request.headers.get('X-Signature', '')):
+        return jsonify({'error': 'Invalid signature'}), 401
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return jsonify({'error': 'Invalid JSON'}), 400
+    
+    # Replayed events are already on record
+    if WEBHOOK_RECORD and not request.headers.get('X-Webhook-Replay'):
+        with open(os.path.join(DATA_DIR, 'webhooks.jsonl'), 'a') as f:
+            f.write(json.dumps(payload) + '\n')
+    
+    try:
+        result = apply_webhook_event(payload)
     except Exception as e:
+        # A non-2xx response makes ClickUp retry the delivery
+        print(f"Error applying webhook event: {e}")
         return jsonify({'error': str(e)}), 500
+    
+    if metrics:
+        metrics.inc('webhook_events_total', {'event': str(payload.get('event')), 'result': result})
+    return jsonify({'result': result})
+
+@app.cli.command('replay-webhooks')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def replay_webhooks(path):
+    """Replay recorded webhook payloads (one JSON object per line) through the webhook route"""
+    secret = next(filter(None, (secret.strip() for secret in WEBHOOK_SECRET.split(","))), None)
+    if not secret:
+        raise click.ClickException('Set CLICKUP_WEBHOOK_SECRET to replay webhooks')
+    
+    with open(path) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    
+    client = app.test_client()
+    for line in lines:
+        body = line.encode()
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        response = client.post('/webhooks/clickup', data=body, content_type='application/json',
+                               headers={'X-Signature': signature, 'X-Webhook-Replay': '1'})
+        payload = json.loads(body)
+        click.echo(f"{payload.get('event')} {payload.get('task_id')}: {response.status_code} {response.get_json()}")
+
+@app.route('/api/cache', methods=['GET'])
+def api_cache_stats():
+    api_token = session.get('api_token')
+    if not api_token:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify(dict(hierarchy_cache.stats(), rollups=rollup_cache.stats()))
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def api_cache_invalidate():
+    api_token = session.get('api_token')
+    if not api_token:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Only the caller's own entries can be dropped
+    dropped = sum(cache.invalidate(
+        api_token,
+        endpoint=request.values.get('endpoint') or None,
+        resource_id=request.values.get('resource_id') or None
+    ) for cache in (hierarchy_cache, rollup_cache))
+    return jsonify({'invalidated': dropped})
 
 # Main function to run the app
 if __name__ == '__main__':
@@ -0,0 +1,271 @@
+"""
+Benchmark scenarios for the ClickUp analyzer against a local mock API.
+
+Each scenario is run ``--iterations`` times. For each one the script prints
+latency percentiles, the upstream ClickUp calls per iteration, and the 429s
+served. Use ``--json`` to save a baseline and ``--baseline`` to compare a
+later run against it. The exit status is 1 when a scenario regresses.
+
+    python benchmarks/bench.py --tasks-per-list 500 --latency-ms 20
+    python benchmarks/bench.py --scenarios crawl,snapshot --cold --json baseline.json
+    python benchmarks/bench.py --baseline baseline.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_clickup import MockServer, SyntheticWorkspace
+
+API_TOKEN = "pk_benchmark"
+GROQ_API_KEY = "gsk_benchmark"
+
+SCENARIOS = (
+    "crawl", "snapshot", "report",
+    "route_dashboard", "route_task_stats", "route_assignees", "route_team"
+)
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty sample"""
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def summarize(name: str, timings: List[float], calls: List[int], throttled: List[int], llm_calls: List[int]) -> Dict:
+    return {
+        "scenario": name,
+        "iterations": len(timings),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 2),
+        "p50_ms": round(percentile(timings, 50) * 1000, 2),
+        "p90_ms": round(percentile(timings, 90) * 1000, 2),
+        "p99_ms": round(percentile(timings, 99) * 1000, 2),
+        "max_ms": round(max(timings) * 1000, 2),
+        "calls_per_iteration": round(sum(calls) / len(calls), 1),
+        "throttled_per_iteration": round(sum(throttled) / len(throttled), 1),
+        "llm_calls_per_iteration": round(sum(llm_calls) / len(llm_calls), 1)
+    }
+
+class Bench:
+    """Runs scenarios against the app module with the mock server behind it"""
+
+    def __init__(self, app_module, mock: MockServer, args: argparse.Namespace):
+        self.app = app_module
+        self.mock = mock
+        self.args = args
+        self.space_id = mock.workspace.spaces[0]["id"]
+        self.client = self._logged_in_client()
+
+    def _logged_in_client(self):
+        client = self.app.app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session["api_token"] = API_TOKEN
+        return client
+
+    def reset_caches(self) -> None:
+        """Forget everything cached between runs, so each iteration starts cold"""
+        app = self.app
+        app.hierarchy_cache.invalidate()
+        app.rollup_cache.invalidate()
+        if app.task_store:
+            for list_item in self.mock.workspace.all_lists():
+                app.task_store.forget_list(list_item["id"])
+        self.reset_completions()
+
+    def reset_completions(self) -> None:
+        """Forget cached LLM completions and rendered reports"""
+        for cache in (self.app.completion_cache, self.app.render_cache):
+            if cache:
+                shutil.rmtree(cache.directory, ignore_errors=True)
+                os.makedirs(cache.directory, exist_ok=True)
+
+    def scenario(self, name: str) -> Callable[[], None]:
+        app, args, space_id = self.app, self.args, self.space_id
+
+        if name == "crawl":
+            # One threaded crawl of the space, without the shared flights and rollup cache of take_snapshot
+            return lambda: app.SpaceSnapshot(API_TOKEN).take(space_id, days_back=args.days_back)
+        if name == "snapshot":
+            return lambda: app.take_snapshot(API_TOKEN, space_id, days_back=args.days_back)
+        if name == "report":
+            # The crawl is timed by the other scenarios; this one times aggregation and the LLM call
+            snapshot = app.take_snapshot(API_TOKEN, space_id)
+            return lambda: app.ReportGenerator(GROQ_API_KEY).generate_report(
+                snapshot["assignee_data"], snapshot["task_stats"], snapshot["space"]["name"]
+            )
+        if name == "route_dashboard":
+            return self._load_dashboard
+        if name == "route_task_stats":
+            return lambda: self._get(f"/api/task_stats/{space_id}?days_back={args.days_back}")
+        if name == "route_assignees":
+            return lambda: self._get(f"/api/assignees/{space_id}")
+        if name == "route_team":
+            return lambda: self._get(f"/api/team/{self.mock.workspace.team['id']}/dashboard?days_back={args.days_back}")
+        raise ValueError(f"Unknown scenario: {name}")
+
+    def _get(self, path: str, client=None) -> None:
+        response = (client or self.client).get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+
+    def _load_dashboard(self) -> None:
+        """Load the page shell, then its sections in parallel as a browser would"""
+        query = f"days_back={self.args.days_back}"
+        self._get(f"/space/{self.space_id}?{query}")
+        sections = [
+            f"/api/task_stats/{self.space_id}?{query}",
+            f"/api/assignees/{self.space_id}",
+            f"/api/task_trend/{self.space_id}?{query}"
+        ]
+        # Test clients are not shared between threads
+        with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+            list(executor.map(lambda path: self._get(path, self._logged_in_client()), sections))
+
+    def run(self, name: str) -> Dict:
+        run_once = self.scenario(name)
+        for _ in range(self.args.warmup):
+            run_once()
+
+        timings, calls, throttled, llm_calls = [], [], [], []
+        for _ in range(self.args.iterations):
+            if self.args.cold:
+                self.reset_caches()
+            elif name == "report":
+                # Otherwise every iteration after the warmup would time a completion cache hit
+                self.reset_completions()
+            self.mock.reset_counters()
+            started = time.perf_counter()
+            run_once()
+            timings.append(time.perf_counter() - started)
+            calls.append(self.mock.total_calls())
+            throttled.append(self.mock.throttled)
+            llm_calls.append(self.mock.calls["llm"])
+        return summarize(name, timings, calls, throttled, llm_calls)
+
+def compare(results: List[Dict], baseline_path: str, tolerance: float) -> List[str]:
+    """Describe every scenario that got slower or chattier than the baseline"""
+    with open(baseline_path) as f:
+        baseline = {result["scenario"]: result for result in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["scenario"])
+        if not previous:
+            continue
+        if result["p50_ms"] > previous["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{result['scenario']}: p50 {previous['p50_ms']}ms -> {result['p50_ms']}ms")
+        if result["calls_per_iteration"] > previous["calls_per_iteration"]:
+            regressions.append(
+                f"{result['scenario']}: upstream calls {previous['calls_per_iteration']} -> {result['calls_per_iteration']}"
+            )
+    return regressions
+
+def print_table(results: List[Dict]) -> None:
+    columns = ("scenario", "iterations", "p50_ms", "p90_ms", "p99_ms", "mean_ms",
+               "calls_per_iteration", "throttled_per_iteration", "llm_calls_per_iteration")
+    headers = ("scenario", "n", "p50 ms", "p90 ms", "p99 ms", "mean ms", "calls", "429s", "llm")
+    rows = [headers] + [tuple(str(result[column]) for column in columns) for result in results]
+    widths = [max(len(row[index]) for row in rows) for index in range(len(headers))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    workspace = parser.add_argument_group("synthetic workspace")
+    workspace.add_argument("--spaces", type=int, default=2)
+    workspace.add_argument("--folders", type=int, default=3)
+    workspace.add_argument("--lists-per-folder", type=int, default=3)
+    workspace.add_argument("--folderless-lists", type=int, default=2)
+    workspace.add_argument("--tasks-per-list", type=int, default=200)
+    workspace.add_argument("--assignees", type=int, default=25)
+    workspace.add_argument("--seed", type=int, default=1)
+
+    server = parser.add_argument_group("mock server")
+    server.add_argument("--latency-ms", type=float, default=0, help="added to every ClickUp response")
+    server.add_argument("--jitter-ms", type=float, default=0, help="random extra latency per response")
+    server.add_argument("--llm-latency-ms", type=float, default=0, help="added to every completion")
+    server.add_argument("--rate-limit-ratio", type=float, default=0.0, help="share of requests answered with 429")
+    server.add_argument("--server-limit", type=int, default=0, help="requests per minute before the server returns 429")
+    server.add_argument("--page-size", type=int, default=100)
+
+    run = parser.add_argument_group("run")
+    run.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    run.add_argument("--iterations", type=int, default=5)
+    run.add_argument("--warmup", type=int, default=1)
+    run.add_argument("--cold", action="store_true", help="clear hierarchy, task and completion caches before each iteration")
+    run.add_argument("--days-back", type=int, default=30)
+    run.add_argument("--client-rate-limit", type=int, default=0,
+                     help="CLICKUP_RATE_LIMIT for the app (0 disables its scheduler)")
+    run.add_argument("--async-client", action="store_true", help="crawl with the aiohttp client (CLICKUP_ASYNC=1)")
+    run.add_argument("--json", dest="json_path", help="write the results to this file")
+    run.add_argument("--baseline", help="compare with the results of an earlier --json run")
+    run.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown against the baseline")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    # Paths are resolved before the run moves into its scratch directory
+    for attr in ("json_path", "baseline"):
+        if getattr(args, attr):
+            setattr(args, attr, os.path.abspath(getattr(args, attr)))
+    workspace = SyntheticWorkspace(
+        spaces=args.spaces, folders=args.folders, lists_per_folder=args.lists_per_folder,
+        folderless_lists=args.folderless_lists, tasks_per_list=args.tasks_per_list,
+        assignees=args.assignees, seed=args.seed
+    )
+    mock = MockServer(
+        workspace, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        rate_limit_ratio=args.rate_limit_ratio, limit_per_minute=args.server_limit,
+        page_size=args.page_size, llm_latency_ms=args.llm_latency_ms, seed=args.seed
+    ).start()
+
+    # The app reads its configuration at import time, and writes reports relative to the working directory
+    workdir = tempfile.mkdtemp(prefix="clickup-bench-")
+    os.environ.update({
+        "CLICKUP_BASE_URL": f"{mock.url}/api/v2",
+        "GROQ_API_URL": f"{mock.url}/openai/v1/chat/completions",
+        "CLICKUP_DATA_DIR": os.path.join(workdir, "data"),
+        "CLICKUP_RATE_LIMIT": str(args.client_rate_limit),
+        "CLICKUP_ASYNC": "1" if args.async_client else "0",
+        # The metrics database would be flushed at exit, after the scratch directory is gone
+        "CLICKUP_METRICS": "0"
+    })
+    os.chdir(workdir)
+    import app as app_module
+
+    print(f"Workspace: {len(workspace.spaces)} spaces, {len(workspace.all_lists())} lists, "
+          f"{workspace.task_count()} tasks; latency {args.latency_ms}ms, 429 ratio {args.rate_limit_ratio}")
+
+    bench = Bench(app_module, mock, args)
+    results = []
+    try:
+        for name in [name.strip() for name in args.scenarios.split(",") if name.strip()]:
+            results.append(bench.run(name))
+    finally:
+        if args.async_client:
+            app_module.async_runner.run(app_module.close_async_sessions())
+        mock.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(results)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
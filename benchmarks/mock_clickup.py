@@ -0,0 +1,283 @@
+"""
+Local mock of the ClickUp v2 API and the Groq chat-completions endpoint.
+
+The server generates a synthetic workspace of configurable size and can add
+latency and inject 429 responses. It counts every call by route, so the
+benchmarks can report how many upstream requests each scenario costs.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+STATUSES = ("to do", "in progress", "review", "complete")
+PRIORITIES = (None, "urgent", "high", "normal", "low")
+DAY_MS = 24 * 60 * 60 * 1000
+
+class SyntheticWorkspace:
+    """A deterministic team -> spaces -> folders -> lists -> tasks hierarchy"""
+
+    def __init__(self, spaces: int = 2, folders: int = 3, lists_per_folder: int = 3,
+                 folderless_lists: int = 2, tasks_per_list: int = 200, assignees: int = 25,
+                 days: int = 90, seed: int = 1):
+        rng = random.Random(seed)
+        now = int(time.time() * 1000)
+        self.team = {"id": "t1", "name": "Benchmark Team"}
+        self.users = [
+            {"id": 1000 + index, "username": f"user{index}", "email": f"user{index}@example.com"}
+            for index in range(assignees)
+        ]
+        self.spaces: List[Dict] = []
+        self.folders: Dict[str, List[Dict]] = {}
+        self.space_lists: Dict[str, List[Dict]] = {}
+        self.folder_lists: Dict[str, List[Dict]] = {}
+        self.tasks: Dict[str, List[Dict]] = {}
+
+        for space_index in range(spaces):
+            space_id = f"s{space_index + 1}"
+            self.spaces.append({"id": space_id, "name": f"Space {space_index + 1}", "team_id": self.team["id"],
+                                "private": False})
+            self.folders[space_id] = []
+            self.space_lists[space_id] = []
+            for folder_index in range(folders):
+                folder_id = f"{space_id}f{folder_index + 1}"
+                self.folders[space_id].append({"id": folder_id, "name": f"Folder {folder_index + 1}"})
+                self.folder_lists[folder_id] = [
+                    {"id": f"{folder_id}l{list_index + 1}", "name": f"{folder_id} List {list_index + 1}"}
+                    for list_index in range(lists_per_folder)
+                ]
+            self.space_lists[space_id] = [
+                {"id": f"{space_id}l{list_index + 1}", "name": f"{space_id} List {list_index + 1}"}
+                for list_index in range(folderless_lists)
+            ]
+
+        for list_item in self.all_lists():
+            self.tasks[list_item["id"]] = [
+                self._task(rng, list_item["id"], index, now, days) for index in range(tasks_per_list)
+            ]
+
+    def _task(self, rng: random.Random, list_id: str, index: int, now: int, days: int) -> Dict:
+        created = now - rng.randrange(days * DAY_MS)
+        priority = rng.choice(PRIORITIES)
+        return {
+            "id": f"{list_id}-{index}",
+            "name": f"Task {index}",
+            "status": self._status(rng.choice(STATUSES)),
+            "priority": {"priority": priority} if priority else None,
+            "assignees": rng.sample(self.users, k=min(len(self.users), rng.choice((0, 1, 1, 1, 2)))),
+            "date_created": str(created),
+            "date_updated": str(rng.randrange(created, now + 1)),
+            "due_date": str(created + 7 * DAY_MS) if rng.random() < 0.5 else None,
+            "list": {"id": list_id}
+        }
+
+    @staticmethod
+    def _status(status: str) -> Dict:
+        return {"status": status, "type": "closed" if status == "complete" else "open"}
+
+    def all_lists(self) -> List[Dict]:
+        lists = [list_item for space_lists in self.space_lists.values() for list_item in space_lists]
+        return lists + [list_item for folder_lists in self.folder_lists.values() for list_item in folder_lists]
+
+    def find_task(self, task_id: str) -> Optional[Dict]:
+        """A task as GET /task/{id} returns it, with its list and space"""
+        for space in self.spaces:
+            space_lists = self.space_lists[space["id"]] + [
+                list_item for folder in self.folders[space["id"]] for list_item in self.folder_lists[folder["id"]]
+            ]
+            for list_item in space_lists:
+                for task in self.tasks[list_item["id"]]:
+                    if task["id"] == task_id:
+                        return dict(task, list=dict(list_item), space={"id": space["id"]})
+        return None
+
+    def task_count(self) -> int:
+        return sum(len(tasks) for tasks in self.tasks.values())
+
+class MockServer:
+    """
+    Threaded HTTP server for a SyntheticWorkspace
+
+    ``latency_ms`` (plus up to ``jitter_ms``) is slept before every ClickUp
+    response and ``llm_latency_ms`` before every completion. A share of
+    ClickUp requests equal to ``rate_limit_ratio`` gets a 429 with
+    ``Retry-After: 0``. When ``limit_per_minute`` is set, the server also
+    enforces a real per-minute window and sends ``X-RateLimit-*`` headers.
+    """
+
+    def __init__(self, workspace: SyntheticWorkspace, latency_ms: float = 0, jitter_ms: float = 0,
+                 rate_limit_ratio: float = 0.0, limit_per_minute: int = 0, page_size: int = 100,
+                 llm_latency_ms: float = 0, seed: int = 1):
+        self.workspace = workspace
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_ratio = rate_limit_ratio
+        self.limit_per_minute = limit_per_minute
+        self.page_size = page_size
+        self.llm_latency_ms = llm_latency_ms
+        self.calls: Counter = Counter()
+        self.throttled = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._window_calls = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "MockServer":
+        server = self
+        handler = type("Handler", (MockHandler,), {"mock": server})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.throttled = 0
+
+    def total_calls(self) -> int:
+        with self._lock:
+            return sum(count for route, count in self.calls.items() if route != "llm")
+
+    def record(self, route: str) -> Optional[Dict[str, str]]:
+        """Count a call; return 429 headers when this call is throttled"""
+        with self._lock:
+            self.calls[route] += 1
+            if route == "llm":
+                return None
+            now = time.time()
+            if now - self._window_start >= 60:
+                self._window_start, self._window_calls = now, 0
+            self._window_calls += 1
+            if self.limit_per_minute and self._window_calls > self.limit_per_minute:
+                self.throttled += 1
+                return self._limit_headers(0)
+            if self.rate_limit_ratio and self._rng.random() < self.rate_limit_ratio:
+                self.throttled += 1
+                return {"Retry-After": "0"}
+            return None
+
+    def limit_headers(self) -> Dict[str, str]:
+        with self._lock:
+            return self._limit_headers(max(0, self.limit_per_minute - self._window_calls))
+
+    def _limit_headers(self, remaining: int) -> Dict[str, str]:
+        if not self.limit_per_minute:
+            return {}
+        return {
+            "X-RateLimit-Limit": str(self.limit_per_minute),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(int(self._window_start + 60))
+        }
+
+    def delay(self, llm: bool = False) -> None:
+        millis = self.llm_latency_ms if llm else self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+        if millis:
+            time.sleep(millis / 1000.0)
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    mock: MockServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        parts = parsed.path.replace("/api/v2", "").strip("/").split("/")
+        route = "/".join(part if index % 2 == 0 else "{id}" for index, part in enumerate(parts))
+
+        throttled = self.mock.record(route)
+        self.mock.delay()
+        if throttled is not None:
+            self._send_json(429, {"err": "Rate limit reached", "ECODE": "APP_002"}, throttled)
+            return
+
+        body = self._route(parts, query)
+        if body is None:
+            self._send_json(404, {"err": "Not found"})
+        else:
+            self._send_json(200, body, self.mock.limit_headers())
+
+    def _route(self, parts: List[str], query: Dict[str, List[str]]) -> Optional[Dict]:
+        workspace = self.mock.workspace
+        if parts == ["team"]:
+            return {"teams": [workspace.team]}
+        if parts[0] == "team" and len(parts) == 3 and parts[2] == "space":
+            return {"spaces": workspace.spaces}
+        if parts[0] == "space" and len(parts) == 2:
+            return next((space for space in workspace.spaces if space["id"] == parts[1]), None)
+        if parts[0] == "space" and len(parts) == 3 and parts[2] == "folder":
+            return {"folders": workspace.folders.get(parts[1], [])}
+        if parts[0] == "space" and len(parts) == 3 and parts[2] == "list":
+            return {"lists": workspace.space_lists.get(parts[1], [])}
+        if parts[0] == "folder" and len(parts) == 3 and parts[2] == "list":
+            return {"lists": workspace.folder_lists.get(parts[1], [])}
+        if parts[0] == "list" and len(parts) == 3 and parts[2] == "task":
+            return self._task_page(parts[1], query)
+        if parts[0] == "task" and len(parts) == 2:
+            return workspace.find_task(parts[1])
+        return None
+
+    def _task_page(self, list_id: str, query: Dict[str, List[str]]) -> Optional[Dict]:
+        tasks = self.mock.workspace.tasks.get(list_id)
+        if tasks is None:
+            return None
+        # Like ClickUp, closed tasks are only listed on request
+        if query.get("include_closed", ["false"])[0] != "true":
+            tasks = [task for task in tasks if task["status"]["type"] != "closed"]
+        for param, field in (("date_created_gt", "date_created"), ("date_updated_gt", "date_updated")):
+            if param in query:
+                cutoff = int(query[param][0])
+                tasks = [task for task in tasks if int(task[field]) > cutoff]
+        page = int(query.get("page", ["0"])[0])
+        size = self.mock.page_size
+        return {"tasks": tasks[page * size:(page + 1) * size], "last_page": (page + 1) * size >= len(tasks)}
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.mock.record("llm")
+        self.mock.delay(llm=True)
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        content = f"# Benchmark Report\n\nPrompt of {len(prompt)} characters analysed.\n"
+
+        if not request.get("stream"):
+            self._send_json(200, {"choices": [{"message": {"content": content}}]})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for word in content.split(" "):
+            chunk = {"choices": [{"delta": {"content": word + " "}}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
@@ -0,0 +1,41 @@
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+# The app reads its configuration at import time
+os.environ.setdefault("CLICKUP_DATA_DIR", tempfile.mkdtemp())
+os.environ.setdefault("CLICKUP_RATE_LIMIT", "0")
+os.environ.setdefault("CLICKUP_METRICS", "0")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+import app
+from mock_clickup import MockServer, SyntheticWorkspace
+
+@pytest.fixture
+def clickup(monkeypatch):
+    """A small synthetic workspace served by the benchmark's mock ClickUp API"""
+    workspace = SyntheticWorkspace(spaces=1, folders=1, lists_per_folder=2, folderless_lists=1,
+                                   tasks_per_list=25, assignees=5)
+    mock = MockServer(workspace).start()
+    monkeypatch.setattr(app, "CLICKUP_BASE_URL", f"{mock.url}/api/v2")
+    yield mock
+    mock.stop()
+
+@pytest.fixture
+def api_token():
+    """A token of its own per test, so no cache or mirror entry is shared between tests"""
+    return f"pk_{uuid.uuid4().hex}"
+
+@pytest.fixture
+def reports(tmp_path, monkeypatch):
+    """An empty reports directory and catalog of its own, swapped in for the app's"""
+    directory = tmp_path / "reports"
+    directory.mkdir()
+    catalog = app.ReportCatalog(str(tmp_path / "reports.db"), str(directory))
+    monkeypatch.setitem(app.app.config, "UPLOAD_FOLDER", str(directory))
+    monkeypatch.setattr(app, "report_catalog", catalog)
+    return catalog
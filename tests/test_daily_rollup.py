@@ -0,0 +1,62 @@
+from collections import Counter
+from datetime import date
+
+import app
+from app import DailyRollup, created_days
+
+def day(iso):
+    return date.fromisoformat(iso).toordinal() - app.EPOCH_ORDINAL
+
+ROLLUP = DailyRollup({
+    "status": {(day("2026-01-01"), "open"): 2, (day("2026-01-03"), "open"): 1, (day("2026-01-03"), "complete"): 4},
+    "priority": {(day("2026-01-01"), "high"): 2, (day("2026-01-03"), "normal"): 5},
+    "assignee": {(day("2026-01-03"), 1001): 3}
+})
+
+def test_counts_sum_the_days_of_a_window():
+    assert ROLLUP.counts("status") == {"open": 3, "complete": 4}
+    assert ROLLUP.counts("status", day("2026-01-02"), day("2026-01-03")) == {"open": 1, "complete": 4}
+    assert ROLLUP.counts("status", None, day("2026-01-02")) == {"open": 2}
+    assert ROLLUP.counts("assignee", day("2026-01-03")) == {1001: 3}
+
+def test_windows_outside_the_bucketed_days():
+    assert ROLLUP.counts("status", day("2026-02-01")) == {}
+    assert ROLLUP.counts("status", None, day("2025-12-31")) == {}
+    assert ROLLUP.counts("status", day("2025-12-01"), day("2026-02-01")) == {"open": 3, "complete": 4}
+    assert ROLLUP.counts("status", day("2026-01-03"), day("2026-01-01")) == {}
+    assert DailyRollup({}).counts("status") == {}
+
+def test_trend_fills_quiet_days_with_zeros():
+    trend = ROLLUP.trend("status", day("2025-12-31"), day("2026-01-04"))
+    assert trend["days"] == ["2025-12-31", "2026-01-01", "2026-01-02", "2026-01-03", "2026-01-04"]
+    assert trend["series"] == {"complete": [0, 0, 0, 4, 0], "open": [0, 2, 0, 1, 0]}
+
+def test_task_stats_of_a_window():
+    stats = ROLLUP.task_stats(day("2026-01-03"))
+    assert stats["total_tasks"] == 5
+    assert stats["completed_tasks"] == 4
+    assert stats["tasks_by_status"] == {"open": 1, "complete": 4}
+
+def test_created_days():
+    assert created_days(None, "2026-01-02", "2026-01-03") == (day("2026-01-02"), day("2026-01-03"))
+    assert created_days(None, None, "2026-01-03") == (None, day("2026-01-03"))
+    assert created_days(None) == (None, None)
+    first_day, last_day = created_days(7)
+    assert last_day is None and first_day in (day(date.today().isoformat()) - 8, day(date.today().isoformat()) - 7)
+
+def test_route_windows_match_the_tasks_created_in_them(clickup, api_token):
+    client = app.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["api_token"] = api_token
+    tasks = [task for tasks in clickup.workspace.tasks.values() for task in tasks
+             if task["status"]["type"] != "closed"]
+    created = {task["id"]: int(task["date_created"]) // app.DAY_MS for task in tasks}
+    days = sorted(set(created.values()))
+
+    for start, end in ((days[0], days[-1]), (days[len(days) // 3], days[2 * len(days) // 3]), (days[-1], days[-1])):
+        expected = Counter(task["status"]["status"] for task in tasks if start <= created[task["id"]] <= end)
+        stats = client.get(
+            f"/api/task_stats/s1?start={app.day_to_iso(start)}&end={app.day_to_iso(end)}"
+        ).get_json()
+        assert stats["total_tasks"] == sum(expected.values())
+        assert stats["tasks_by_status"] == dict(expected)
@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+
+import pytest
+
+import app
+from mock_clickup import MockServer, SyntheticWorkspace
+
+def logged_in_client(api_token):
+    client = app.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["api_token"] = api_token
+    return client
+
+def open_tasks(workspace, created_after=None, created_before=None):
+    return {
+        task["id"]: task for list_item in workspace.all_lists() for task in workspace.tasks[list_item["id"]]
+        if task["status"]["type"] != "closed"
+        and (created_after is None or int(task["date_created"]) > created_after)
+        and (created_before is None or int(task["date_created"]) < created_before)
+    }
+
+@pytest.fixture
+def large_clickup(monkeypatch):
+    """Lists longer than one export batch, so a stream can fail after its first batch"""
+    workspace = SyntheticWorkspace(spaces=1, folders=1, lists_per_folder=1, folderless_lists=1,
+                                   tasks_per_list=250, assignees=5)
+    mock = MockServer(workspace).start()
+    monkeypatch.setattr(app, "CLICKUP_BASE_URL", f"{mock.url}/api/v2")
+    yield mock
+    mock.stop()
+
+def test_ndjson_export_streams_every_open_task(clickup, api_token):
+    response = logged_in_client(api_token).get("/api/export/s1")
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    expected = open_tasks(clickup.workspace)
+    assert {row["id"] for row in rows} == expected.keys()
+    assert list(rows[0]) == list(app.DEFAULT_EXPORT_FIELDS)
+    for row in rows:
+        task = expected[row["id"]]
+        assert row["date_created"] == int(task["date_created"])
+        assert row["assignees"] == [assignee["username"] for assignee in task["assignees"]]
+
+def test_csv_export_selects_fields_and_joins_lists(clickup, api_token):
+    response = logged_in_client(api_token).get("/api/export/s1?format=csv&fields=id,assignee_ids,list_id")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert rows[0] == ["id", "assignee_ids", "list_id"]
+    expected = open_tasks(clickup.workspace)
+    assert {row[0] for row in rows[1:]} == expected.keys()
+    for task_id, assignee_ids, list_id in rows[1:]:
+        task = expected[task_id]
+        assert assignee_ids == "; ".join(str(assignee["id"]) for assignee in task["assignees"])
+        assert list_id == task["list"]["id"]
+
+def test_export_honours_the_created_window(clickup, api_token):
+    client = logged_in_client(api_token)
+    first_day, _ = app.created_days(7)
+    rows = client.get("/api/export/s1?days_back=7&fields=id").get_data(as_text=True).splitlines()
+    expected = open_tasks(clickup.workspace, created_after=first_day * app.DAY_MS - 1)
+    assert {json.loads(row)["id"] for row in rows} == expected.keys()
+
+    start = app.datetime.fromtimestamp(first_day * app.DAY_MS / 1000, app.timezone.utc).strftime("%Y-%m-%d")
+    rows = client.get(f"/api/export/s1?start=2000-01-01&end={start}&fields=id").get_data(as_text=True).splitlines()
+    expected = open_tasks(clickup.workspace, created_before=(first_day + 1) * app.DAY_MS)
+    assert {json.loads(row)["id"] for row in rows} == expected.keys()
+
+def test_export_rejects_unknown_formats_and_fields(clickup, api_token):
+    client = logged_in_client(api_token)
+    assert client.get("/api/export/s1?format=xlsx").status_code == 400
+    assert client.get("/api/export/s1?fields=id,secret").status_code == 400
+
+def test_failure_on_the_first_page_gets_an_error_status(large_clickup, api_token):
+    first_list = large_clickup.workspace.all_lists()[0]["id"]
+    del large_clickup.workspace.tasks[first_list]
+    response = logged_in_client(api_token).get("/api/export/s1?format=csv")
+    assert response.status_code == 500
+    assert "error" in response.get_json()
+
+@pytest.mark.parametrize("export_format", ["csv", "ndjson"])
+def test_failure_mid_stream_ends_with_an_error_marker(large_clickup, api_token, export_format):
+    last_list = large_clickup.workspace.all_lists()[-1]["id"]
+    del large_clickup.workspace.tasks[last_list]
+    response = logged_in_client(api_token).get(f"/api/export/s1?format={export_format}&fields=id")
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    if export_format == "csv":
+        rows = list(csv.reader(io.StringIO(body)))
+        assert rows[-1][0] == "#error"
+        assert len(rows) - 2 >= 100
+    else:
+        lines = [json.loads(line) for line in body.splitlines()]
+        assert "error" in lines[-1]
+        assert len(lines) - 1 >= 100
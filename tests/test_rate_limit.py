@@ -0,0 +1,43 @@
+import time
+
+from app import RateLimitScheduler
+
+def timed_acquire(scheduler, api_token):
+    started = time.time()
+    scheduler.acquire(api_token)
+    return time.time() - started
+
+def test_bucket_is_shared_by_every_worker(tmp_path):
+    db_path = str(tmp_path / "rate_limits.db")
+    # Two schedulers on one database stand in for two gunicorn workers
+    first = RateLimitScheduler(db_path, per_minute=4, max_wait=0.3)
+    second = RateLimitScheduler(db_path, per_minute=4, max_wait=0.3)
+
+    for scheduler in (first, second, first, second):
+        assert timed_acquire(scheduler, "pk_a") < 0.1
+    # The quota is spent: the next request waits (here until max_wait) for a slot
+    assert timed_acquire(second, "pk_a") >= 0.25
+
+def test_tokens_have_separate_buckets(tmp_path):
+    scheduler = RateLimitScheduler(str(tmp_path / "rate_limits.db"), per_minute=1, max_wait=0.3)
+    scheduler.acquire("pk_a")
+    assert timed_acquire(scheduler, "pk_b") < 0.1
+
+def test_429_drains_the_bucket_until_the_server_window_resets(tmp_path):
+    scheduler = RateLimitScheduler(str(tmp_path / "rate_limits.db"), per_minute=100, max_wait=5)
+    scheduler.observe("pk_a", 429, {"X-RateLimit-Reset": str(time.time() + 0.5)})
+
+    waited = timed_acquire(scheduler, "pk_a")
+    assert 0.4 <= waited < 1.5
+
+def test_remaining_header_corrects_the_bucket(tmp_path):
+    scheduler = RateLimitScheduler(str(tmp_path / "rate_limits.db"), per_minute=100, max_wait=0.3)
+    # Other clients of the same token used most of the quota
+    scheduler.observe("pk_a", 200, {"X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "1"})
+
+    assert timed_acquire(scheduler, "pk_a") < 0.1
+    assert timed_acquire(scheduler, "pk_a") >= 0.25
+
+def test_backoff_honours_retry_after():
+    assert 2.0 <= RateLimitScheduler.backoff(0, {"Retry-After": "2"}) <= 3.0
+    assert RateLimitScheduler.backoff(3, {}) >= 8.0
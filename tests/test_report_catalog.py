@@ -0,0 +1,68 @@
+import os
+
+import app
+
+def touch_report(directory, space_id, timestamp="20260101_120000", content="# Report\n"):
+    filename = f"clickup_report_{space_id}_{timestamp}.md"
+    with open(os.path.join(directory, filename), "w") as f:
+        f.write(content)
+    return filename
+
+def test_first_reindex_shares_pre_catalog_reports_with_everyone(tmp_path):
+    directory = tmp_path / "reports"
+    directory.mkdir()
+    filename = touch_report(directory, "s1")
+    touch_report(directory, "s1", "not_a_timestamp")
+
+    catalog = app.ReportCatalog(str(tmp_path / "reports.db"), str(directory))
+    assert catalog.reindex() == 1
+    entry = catalog.get(filename, "pk_anyone")
+    assert entry["space_id"] == "s1"
+    assert entry["mode"] == "unknown"
+    assert entry["size"] == len("# Report\n")
+    assert catalog.get(filename, "pk_someone_else") is not None
+
+def test_files_found_after_the_backfill_are_hidden_as_orphans(reports, api_token):
+    assert reports.reindex() == 0
+    owned = touch_report(reports.directory, "s1")
+    reports.add(owned, "s1", "Space 1", "ai", api_token)
+    orphan = touch_report(reports.directory, "s2")
+
+    assert reports.reindex() == 1
+    assert reports.get(orphan, api_token) is None
+    assert reports.search(api_token)[1] == 1
+    assert reports.reindex() == 0
+
+def test_reindex_drops_entries_whose_file_is_gone(reports, api_token):
+    filename = touch_report(reports.directory, "s1")
+    reports.add(filename, "s1", "Space 1", "basic", api_token)
+    os.remove(os.path.join(reports.directory, filename))
+
+    reports.reindex()
+    assert reports.get(filename, api_token) is None
+
+def test_search_and_get_only_see_the_callers_reports(reports, api_token):
+    other = "pk_someone_else"
+    mine = touch_report(reports.directory, "s1", "20260101_120000")
+    theirs = touch_report(reports.directory, "s1", "20260102_120000")
+    reports.add(mine, "s1", "Space 1", "basic", api_token)
+    reports.add(theirs, "s1", "Space 1", "ai", other)
+
+    assert reports.get(mine, api_token)["filename"] == mine
+    assert reports.get(theirs, api_token) is None
+    page, total = reports.search(api_token)
+    assert total == 1
+    assert [entry["filename"] for entry in page] == [mine]
+    assert reports.search(other, mode="basic") == ([], 0)
+
+def test_search_filters_and_pages_newest_first(reports, api_token):
+    filenames = [touch_report(reports.directory, space_id, f"2026010{day}_120000")
+                 for day, space_id in enumerate(["s1", "s2", "s1"], start=1)]
+    for filename, space_id in zip(filenames, ["s1", "s2", "s1"]):
+        reports.add(filename, space_id, None, "basic", api_token)
+
+    page, total = reports.search(api_token, space_id="s1", limit=1)
+    assert total == 2
+    assert [entry["filename"] for entry in page] == [filenames[2]]
+    page, _ = reports.search(api_token, space_id="s1", limit=1, offset=1)
+    assert [entry["filename"] for entry in page] == [filenames[0]]
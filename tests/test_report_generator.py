@@ -0,0 +1,50 @@
+import app
+
+def team(size):
+    return {
+        1000 + index: {
+            "name": f"Member {index}",
+            "email": f"member{index}@example.com",
+            "username": f"member{index}",
+            "task_count": 1 + index % 7,
+            "tasks": [],
+            "lists": [f"List {index % 3}"]
+        }
+        for index in range(size)
+    }
+
+def task_stats():
+    return dict(app.new_task_stats(), total_tasks=100, completed_tasks=40, open_tasks=60)
+
+def test_reduce_prompt_is_condensed_to_the_budget(monkeypatch):
+    monkeypatch.setattr(app, "LLM_PROMPT_TOKEN_BUDGET", 1500)
+    monkeypatch.setattr(app, "LLM_MAP_CHUNK_TOKENS", 200)
+    generator = app.ReportGenerator("gsk_test", mode="map_reduce")
+    prompts = []
+
+    def complete(payload):
+        prompts.append(payload["messages"][1]["content"])
+        # Every intermediate analysis is about 300 tokens long
+        return "- finding " * 120
+
+    monkeypatch.setattr(generator, "_complete", complete)
+    summary = generator._prepare_data_summary(team(120))
+    steps = list(generator._payload_steps(summary, task_stats(), "Space"))
+
+    payload = generator._build_payload(summary, task_stats(), "Space")
+    reduce_prompt = payload["messages"][1]["content"]
+    builder = app.PromptBuilder(1500)
+    assert builder.estimate_tokens(reduce_prompt) <= 1500
+    assert {step["stage"] for step in steps} == {"map", "combine"}
+    assert all(builder.estimate_tokens(prompt) <= 1500 for prompt in prompts)
+
+def test_small_team_is_reduced_without_condensing(monkeypatch):
+    monkeypatch.setattr(app, "LLM_MAP_CHUNK_TOKENS", 200)
+    generator = app.ReportGenerator("gsk_test", mode="map_reduce")
+    monkeypatch.setattr(generator, "_complete", lambda payload: "- finding")
+
+    summary = generator._prepare_data_summary(team(12))
+    steps = list(generator._payload_steps(summary, task_stats(), "Space"))
+
+    assert steps and {step["stage"] for step in steps} == {"map"}
+    assert steps[-1]["done"] == steps[-1]["total"]
@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+import app
+
+@pytest.fixture
+def jobs(tmp_path):
+    return app.ReportJobStore(str(tmp_path / "report_jobs.db"), stale_after=60)
+
+def age(jobs, job_id, seconds):
+    with app.connect_sqlite(jobs.db_path) as conn:
+        conn.execute("UPDATE report_jobs SET updated_at = ? WHERE job_id = ?", (time.time() - seconds, job_id))
+
+@pytest.mark.parametrize("status", ["queued", "running"])
+def test_stale_unfinished_job_is_reported_lost(jobs, api_token, status):
+    job_id = jobs.create(api_token, "s1")
+    if status == "running":
+        jobs.update(job_id, status="running", stage="crawl")
+    age(jobs, job_id, 120)
+
+    job = jobs.get(job_id, api_token)
+    assert (job["status"], job["error"]) == ("failed", "Worker lost")
+    assert jobs.get(job_id, api_token)["status"] == "failed"
+
+def test_recent_and_finished_jobs_are_left_alone(jobs, api_token):
+    queued = jobs.create(api_token, "s1")
+    done = jobs.create(api_token, "s1")
+    jobs.update(done, status="done", stage="done", filename="report.md")
+    age(jobs, done, 120)
+
+    assert jobs.get(queued, api_token)["status"] == "queued"
+    assert jobs.get(done, api_token)["status"] == "done"
+
+def test_job_belongs_to_its_token(jobs, api_token):
+    job_id = jobs.create(api_token, "s1")
+    assert jobs.get(job_id, "pk_someone_else") is None
@@ -0,0 +1,65 @@
+import asyncio
+import gc
+
+import app
+
+def logged_in_client(api_token):
+    client = app.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["api_token"] = api_token
+    return client
+
+def test_logout_leaves_sessions_in_use_open(clickup, api_token):
+    manager = app.ClickUpManager(api_token)
+    manager.get_all_teams()
+    logged_in_client(api_token).get("/logout")
+
+    # A request that started before the logout carries on over its session
+    assert api_token not in app._sessions
+    assert manager._get("/team")["teams"] == [clickup.workspace.team]
+    assert app.get_session(api_token) is not manager.session
+
+def test_released_session_is_closed_once_unused(clickup, api_token):
+    manager = app.ClickUpManager(api_token)
+    manager.get_all_teams()
+    adapter = manager.session.get_adapter(clickup.url)
+    assert adapter.poolmanager.pools
+
+    app.release_session(api_token)
+    del manager
+    gc.collect()
+    assert not adapter.poolmanager.pools
+
+def test_retired_async_session_closes_after_its_requests(clickup, api_token):
+    async def scenario():
+        started, resume = asyncio.Event(), asyncio.Event()
+        async with app.borrow_async_session(api_token) as http:
+            async def request():
+                async with app.borrow_async_session(api_token) as same:
+                    started.set()
+                    await resume.wait()
+                    async with same.get(f"{clickup.url}/api/v2/team") as response:
+                        return response.status, same
+
+            pending = asyncio.ensure_future(request())
+            await started.wait()
+        await app.retire_async_session(api_token)
+        assert not http.closed
+        resume.set()
+        status, same = await pending
+        return status, http, same
+
+    status, http, same = app.async_runner.run(scenario(), timeout=10)
+    assert status == 200
+    assert same is http
+    assert http.closed
+    assert api_token not in app._async_sessions
+
+def test_idle_async_session_is_closed_when_retired(api_token):
+    async def scenario():
+        async with app.borrow_async_session(api_token) as http:
+            pass
+        await app.retire_async_session(api_token)
+        return http
+
+    assert app.async_runner.run(scenario(), timeout=10).closed
@@ -0,0 +1,127 @@
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import app
+from app import SingleFlight
+
+def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    release = threading.Event()
+    runs = []
+
+    def crawl():
+        runs.append(1)
+        release.wait(5)
+        return {"tasks": 3}
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        futures = [executor.submit(flights.do, "space", crawl) for _ in range(6)]
+        time.sleep(0.2)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert runs == [1]
+    assert all(result is results[0] for result in results)
+
+def test_exception_reaches_every_caller_and_is_not_kept():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("ClickUp is down")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flights.do, "space", failing) for _ in range(3)]
+        time.sleep(0.2)
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="ClickUp is down"):
+                future.result()
+
+    assert flights.do("space", lambda: "recovered") == "recovered"
+
+def run_in_worker(flights, key, fn, encode=None, decode=None):
+    """Call ``do`` from a thread of its own, which owns its lease like another gunicorn worker"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(flights.do, key, fn, encode, decode)
+    executor.shutdown(wait=False)
+    return future
+
+def test_worker_follower_gets_the_leaders_result_through_json(tmp_path):
+    db_path = str(tmp_path / "flights.db")
+    leader, follower = SingleFlight(db_path, poll_interval=0.02), SingleFlight(db_path, poll_interval=0.02)
+    started = threading.Event()
+    runs = []
+
+    def crawl():
+        runs.append(1)
+        started.set()
+        time.sleep(0.3)
+        return {1001: "alice", 1002: "bob"}
+
+    # Integer keys do not survive JSON objects, so the result is shared as pairs
+    encode = lambda result: list(result.items())
+    decode = lambda pairs: {key: value for key, value in pairs}
+
+    led = run_in_worker(leader, "space", crawl, encode, decode)
+    started.wait(5)
+    followed = run_in_worker(follower, "space", lambda: runs.append(1), encode, decode)
+
+    assert led.result(5) == {1001: "alice", 1002: "bob"}
+    assert followed.result(5) == {1001: "alice", 1002: "bob"}
+    assert runs == [1]
+
+def test_heartbeat_keeps_a_slow_leaders_lease(tmp_path):
+    db_path = str(tmp_path / "flights.db")
+    leader = SingleFlight(db_path, lease=0.3, poll_interval=0.02)
+    follower = SingleFlight(db_path, lease=0.3, poll_interval=0.02)
+    started = threading.Event()
+    runs = []
+
+    def slow_crawl():
+        runs.append("leader")
+        started.set()
+        time.sleep(1.0)
+        return "done"
+
+    led = run_in_worker(leader, "space", slow_crawl)
+    started.wait(5)
+    # Well past the lease: only a renewed lease keeps the follower waiting
+    time.sleep(0.5)
+    followed = run_in_worker(follower, "space", lambda: runs.append("follower") or "taken over")
+
+    assert led.result(5) == "done"
+    assert followed.result(5) == "done"
+    assert runs == ["leader"]
+
+def test_expired_lease_of_a_lost_leader_is_taken_over(tmp_path):
+    db_path = str(tmp_path / "flights.db")
+    flights = SingleFlight(db_path, lease=0.3, poll_interval=0.02)
+    # A leader that died mid-call leaves its lease behind and never renews it
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO flights (key, owner, expires_at, waiters) VALUES (?, ?, ?, 0)",
+            ("space", "gone:1:1", time.time() + 0.3)
+        )
+
+    started = time.time()
+    assert flights.do("space", lambda: "recrawled") == "recrawled"
+    assert time.time() - started >= 0.25
+
+def test_snapshot_survives_the_json_round_trip(clickup, api_token):
+    snapshot = app.crawl_space(api_token, "s1")
+    shared = app.snapshot_from_json(json.loads(json.dumps(app.snapshot_to_json(snapshot))))
+
+    assert list(shared["assignee_data"]) == list(snapshot["assignee_data"])
+    for assignee_id, data in snapshot["assignee_data"].items():
+        assert [task.to_dict() for task in shared["assignee_data"][assignee_id]["tasks"]] == \
+            [task.to_dict() for task in data["tasks"]]
+    for dimension in app.DailyRollup.DIMENSIONS:
+        assert shared["rollup"].counts(dimension) == snapshot["rollup"].counts(dimension)
+        assert shared["rollup"].trend(dimension) == snapshot["rollup"].trend(dimension)
@@ -0,0 +1,67 @@
+from app import TaskStore
+
+def make_task(task_id, status, status_type, updated):
+    return {
+        "id": task_id,
+        "status": {"status": status, "type": status_type},
+        "date_created": "1000",
+        "date_updated": str(updated)
+    }
+
+def test_task_closed_between_syncs_updates_stored_status(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.db"))
+    upstream = {"t1": make_task("t1", "open", "open", 2000)}
+
+    def fetch(params):
+        # ClickUp omits closed tasks unless include_closed=true
+        for task in upstream.values():
+            if task["status"]["type"] == "closed" and params.get("include_closed") != "true":
+                continue
+            if int(task["date_updated"]) > params.get("date_updated_gt", -1):
+                yield task
+
+    store.sync_list("tok", "l1", fetch)
+    assert [task["status"]["status"] for task in store.iter_tasks("tok", "l1")] == ["open"]
+
+    upstream["t1"] = make_task("t1", "complete", "closed", 3000)
+    store.sync_list("tok", "l1", fetch)
+
+    assert list(store.iter_tasks("tok", "l1")) == []
+    assert [task["status"]["status"] for task in store.iter_tasks("tok", "l1", include_closed=True)] == ["complete"]
+
+def test_delta_sync_overlapping_full_reconcile_keeps_tasks(tmp_path):
+    db_path = str(tmp_path / "tasks.db")
+    store = TaskStore(db_path)
+    store.sync_list("tok", "l1", lambda params: iter([make_task("t1", "open", "open", 2000)]))
+
+    # B plans a delta at generation 1, then A plans the hourly full listing at generation 2
+    delta = store.begin_sync("tok", "l1")
+    full = TaskStore(db_path, reconcile_interval=0).begin_sync("tok", "l1")
+    assert not delta["full"] and full["full"]
+
+    store.store_tasks(full, [make_task("t1", "open", "open", 2000)])
+    # B rewrites t1 after A listed it, and stores a task created after A's listing began
+    store.store_tasks(delta, [
+        make_task("t1", "review", "custom", 3000),
+        make_task("t2", "open", "open", int(full["started_at"] * 1000) + 1)
+    ])
+    store.finish_sync(full)
+    store.finish_sync(delta)
+
+    assert sorted(task["id"] for task in store.iter_tasks("tok", "l1")) == ["t1", "t2"]
+    # B finished last, but the list keeps A's generation and the newest high-water mark
+    follow_up = store.begin_sync("tok", "l1")
+    assert follow_up["sync_gen"] == 2
+    assert follow_up["high_water"] == int(full["started_at"] * 1000) + 1
+
+def test_tasks_are_only_served_to_the_token_that_fetched_them(tmp_path):
+    store = TaskStore(str(tmp_path / "tasks.db"))
+    store.sync_list("member", "l1", lambda params: iter([
+        make_task("t1", "open", "open", 2000), make_task("t2", "open", "open", 2000)
+    ]))
+    # A guest token only gets the tasks shared with it
+    store.sync_list("guest", "l1", lambda params: iter([make_task("t1", "open", "open", 2000)]))
+
+    assert [task["id"] for task in store.iter_tasks("guest", "l1")] == ["t1"]
+    assert sorted(task["id"] for task in store.iter_tasks("member", "l1")) == ["t1", "t2"]
+    assert list(store.iter_tasks("other", "l1")) == []
@@ -0,0 +1,20 @@
+import app
+
+def logged_in_client(api_token):
+    client = app.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["api_token"] = api_token
+    return client
+
+def test_warm_team_dashboard_reuses_space_rollups(clickup, api_token):
+    client = logged_in_client(api_token)
+    first = client.get(f"/api/team/{clickup.workspace.team['id']}/dashboard?days_back=30")
+    assert first.status_code == 200
+
+    # Another window is summed from the cached rollups without crawling again
+    clickup.reset_counters()
+    response = client.get(f"/api/team/{clickup.workspace.team['id']}/dashboard?days_back=7")
+    assert response.status_code == 200
+    assert clickup.total_calls() == 0
+    space_stats = response.get_json()["spaces"][0]["task_stats"]
+    assert space_stats == client.get("/api/task_stats/s1?days_back=7").get_json()
@@ -0,0 +1,64 @@
+import os
+
+import app
+
+def logged_in_client(api_token):
+    client = app.app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["api_token"] = api_token
+    return client
+
+def write_report(reports, api_token, content="# Report\n\nAll done.\n"):
+    filename = "clickup_report_s1_20260101_120000.md"
+    with open(os.path.join(reports.directory, filename), "w") as f:
+        f.write(content)
+    reports.add(filename, "s1", "Space 1", "basic", api_token)
+    return filename
+
+def test_report_page_carries_a_weak_etag_with_the_page_version(reports, api_token):
+    filename = write_report(reports, api_token)
+    response = logged_in_client(api_token).get(f"/view_report/{filename}")
+    assert response.status_code == 200
+    tag, weak = response.get_etag()
+    assert weak
+    assert tag.endswith(f"-{app.PAGE_VERSION}")
+    assert response.last_modified is not None
+    assert "private" in response.headers["Cache-Control"]
+
+def test_unchanged_report_is_answered_with_304(reports, api_token):
+    filename = write_report(reports, api_token)
+    client = logged_in_client(api_token)
+    etag = client.get(f"/view_report/{filename}").headers["ETag"]
+
+    response = client.get(f"/view_report/{filename}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+def test_changed_report_or_page_version_is_sent_again(reports, api_token, monkeypatch):
+    filename = write_report(reports, api_token)
+    client = logged_in_client(api_token)
+    etag = client.get(f"/view_report/{filename}").headers["ETag"]
+
+    write_report(reports, api_token, "# Report\n\nRewritten.\n")
+    assert client.get(f"/view_report/{filename}", headers={"If-None-Match": etag}).status_code == 200
+
+    etag = client.get(f"/view_report/{filename}").headers["ETag"]
+    monkeypatch.setattr(app, "PAGE_VERSION", "redeployed")
+    assert client.get(f"/view_report/{filename}", headers={"If-None-Match": etag}).status_code == 200
+
+def test_page_with_pending_flashes_is_never_revalidated(reports, api_token):
+    filename = write_report(reports, api_token)
+    client = logged_in_client(api_token)
+    etag = client.get(f"/view_report/{filename}").headers["ETag"]
+
+    with client.session_transaction() as flask_session:
+        flask_session["_flashes"] = [("info", "Report saved")]
+    response = client.get(f"/view_report/{filename}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert b"Report saved" in response.data
+
+def test_report_of_another_token_is_not_shown(reports, api_token):
+    filename = write_report(reports, api_token)
+    response = logged_in_client("pk_someone_else").get(f"/view_report/{filename}")
+    assert response.status_code == 302
@@ -0,0 +1,79 @@
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+
+import app
+
+SECRET = "webhook-secret"
+
+@pytest.fixture
+def counters(tmp_path, monkeypatch, clickup, api_token):
+    monkeypatch.setattr(app, "WEBHOOK_SECRET", SECRET)
+    monkeypatch.setattr(app, "WEBHOOK_API_TOKEN", api_token)
+    monkeypatch.setattr(app, "space_counters", app.SpaceCounters(str(tmp_path / "counters.db"), 3600))
+    # A complete crawl seeds the counters
+    app.crawl_space(api_token, "s1")
+    return app.space_counters
+
+def post_event(payload):
+    body = json.dumps(payload).encode()
+    signature = hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+    response = app.app.test_client().post("/webhooks/clickup", data=body, headers={"X-Signature": signature})
+    assert response.status_code == 200
+    return response.get_json()["result"]
+
+def set_status(clickup, task, status):
+    # What the change looks like upstream, for the next crawl
+    task["status"] = clickup.workspace._status(status)
+    task["date_updated"] = str(int(time.time() * 1000))
+
+def assert_counters_match_crawl(counters, api_token):
+    counted = counters.rollup(api_token, "s1")["rollup"]
+    crawled = app.SpaceSnapshot(api_token).take("s1")["rollup"]
+    assert counted.task_stats() == crawled.task_stats()
+    assert counted.counts("assignee") == crawled.counts("assignee")
+
+def open_task(clickup):
+    return next(task for tasks in clickup.workspace.tasks.values() for task in tasks
+                if task["status"]["type"] != "closed" and task["assignees"])
+
+def test_closing_a_task_removes_it_like_a_crawl(clickup, counters, api_token):
+    total = counters.rollup(api_token, "s1")["rollup"].task_stats()["total_tasks"]
+    task = open_task(clickup)
+    set_status(clickup, task, "complete")
+
+    assert post_event({
+        "event": "taskStatusUpdated",
+        "task_id": task["id"],
+        "history_items": [{"field": "status", "before": {"status": "to do", "type": "open"},
+                           "after": {"status": "complete", "type": "closed"}}]
+    }) == "applied"
+
+    assert counters.rollup(api_token, "s1")["rollup"].task_stats()["total_tasks"] == total - 1
+    assert_counters_match_crawl(counters, api_token)
+
+def test_reopening_a_closed_task_fetches_it_back(clickup, counters, api_token):
+    task = open_task(clickup)
+    set_status(clickup, task, "complete")
+    post_event({"event": "taskStatusUpdated", "task_id": task["id"],
+                "history_items": [{"field": "status", "after": {"status": "complete", "type": "closed"}}]})
+
+    set_status(clickup, task, "in progress")
+    assert post_event({
+        "event": "taskStatusUpdated",
+        "task_id": task["id"],
+        "history_items": [{"field": "status", "after": {"status": "in progress", "type": "custom"}}]
+    }) == "fetched"
+
+    assert_counters_match_crawl(counters, api_token)
+
+def test_closed_task_fetched_on_creation_is_not_counted(clickup, counters, api_token):
+    task = open_task(clickup)
+    set_status(clickup, task, "complete")
+
+    post_event({"event": "taskCreated", "task_id": task["id"]})
+
+    assert_counters_match_crawl(counters, api_token)